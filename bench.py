@@ -0,0 +1,310 @@
+"""
+CyberAI Orchestrator - Benchmark Suite
+Measures latency, throughput and peak memory of the decision pipeline on
+seeded synthetic catalogs shaped like AI_AGENTS (25 to 1M agents):
+scoring (reference calculate_agent_score and the vectorized matrix), top-k
+selection, live ranking updates, containment simulation, weight sensitivity
+sweeps, chart building (per-agent and consolidated radar figures, cold and
+cached, with their serialized payload sizes) and PDF rendering. Results are
+written as JSON and can be compared against a saved baseline to catch
+regressions.
+
+Usage:
+    python bench.py --sizes 25 10000 1000000 --output bench.json
+    python bench.py --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from engine import (AGENT_RECORDS, THREAT_TYPES, AgentCatalog, calculate_agent_score, compile_coverage_masks,
+                    rank_agents, score_agents_matrix, top_k_indices)
+from live import LiveRankings
+from sensitivity import sensitivity_analysis
+from simulation import simulate, simulate_recommendations, success_probability
+
+DEFAULT_SIZES = (25, 1000, 100000, 1000000)
+# calculate_agent_score runs once per agent in Python; skip it on larger catalogs
+REFERENCE_MAX_ROWS = 20000
+GENERATE_CHUNK = 65536
+SIMULATION_TRIALS = 10000
+SIMULATION_MAX_DRAWS = 20_000_000
+SENSITIVITY_VECTORS = 1000
+SENSITIVITY_MAX_CELLS = 100_000_000
+
+
+def _coverage_distribution():
+    """Tag frequencies and tags-per-agent counts observed in AGENT_RECORDS"""
+    counts = {}
+    per_agent = []
+    for record in AGENT_RECORDS:
+        tags = record['coverage'].split(',')
+        per_agent.append(len(tags))
+        for tag in tags:
+            counts[tag] = counts.get(tag, 0) + 1
+    # Threat types no built-in agent covers still show up, rarely
+    for threat in THREAT_TYPES:
+        counts.setdefault(threat, 0.5)
+    tags = sorted(counts)
+    weights = np.array([counts[tag] for tag in tags], dtype=np.float64)
+    sizes, size_counts = np.unique(per_agent, return_counts=True)
+    return tags, weights / weights.sum(), sizes, size_counts / size_counts.sum()
+
+
+def synthetic_catalog(rows, seed=0):
+    """
+    AgentCatalog of rows synthetic agents. Metrics are drawn around the ranges
+    of the built-in agents; each agent covers as many tags as a built-in agent
+    typically does, picked with the built-in tag frequencies (Gumbel top-k
+    sampling without replacement, vectorized in chunks).
+    """
+    rng = np.random.default_rng(seed)
+    tags, weights, sizes, size_probs = _coverage_distribution()
+    log_weights = np.log(weights)
+
+    tag_masks = np.zeros(rows, dtype=np.int64)
+    for start in range(0, rows, GENERATE_CHUNK):
+        stop = min(rows, start + GENERATE_CHUNK)
+        keys = log_weights + rng.gumbel(size=(stop - start, len(tags)))
+        ranks = np.argsort(-keys, axis=1)
+        n_tags = rng.choice(sizes, size=stop - start, p=size_probs)
+        chosen = np.arange(len(tags))[None, :] < n_tags[:, None]
+        tag_masks[start:stop] = np.where(chosen, np.int64(1) << ranks, 0).sum(axis=1)
+
+    combos, coverage_codes = np.unique(tag_masks, return_inverse=True)
+    coverage_labels = np.array(
+        [','.join(tag for bit, tag in enumerate(tags) if int(combo) >> bit & 1) for combo in combos], dtype=object
+    )
+    names = np.array([f"Synthetic Agent {i:07d}" for i in range(rows)], dtype=object)
+    columns = {
+        'id': np.arange(1, rows + 1, dtype=np.int64),
+        'name': np.arange(rows, dtype=np.int32),
+        'effectiveness': np.round(np.clip(rng.normal(0.89, 0.03, rows), 0.70, 0.99), 2),
+        'speed': np.round(np.clip(rng.normal(8.0, 0.8, rows), 5.0, 9.9), 1),
+        'fp_rate': np.round(np.clip(rng.gamma(4.0, 0.01, rows), 0.01, 0.15), 2),
+        'cost': np.round(np.clip(rng.lognormal(np.log(720), 0.2, rows), 200, 2500), -1),
+        'coverage': coverage_codes.astype(np.int32),
+        'coverage_mask': compile_coverage_masks(coverage_labels)[coverage_codes]
+    }
+    return AgentCatalog(columns, {'name': names, 'coverage': coverage_labels},
+                        version=f"synthetic-{rows}-{seed}")
+
+
+def measure(fn, repeat=5, items=1):
+    """
+    Runs fn once to warm up, then repeat timed runs and one tracemalloc run.
+    items is the work done per call (rows, figures, ...), for throughput.
+    """
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(times)
+    return {
+        'repeat': repeat,
+        'median_s': median,
+        'min_s': min(times),
+        'p90_s': float(np.percentile(times, 90)),
+        'throughput_per_s': items / median if median > 0 else None,
+        'peak_mb': round(peak / 2**20, 3)
+    }
+
+
+def bench_catalog(agents, threat_type='ransomware'):
+    """Scoring and top-k benchmarks for one catalog; yields (name, items, fn)"""
+    rows = len(agents)
+    threats = list(THREAT_TYPES)
+
+    if rows <= REFERENCE_MAX_ROWS:
+        records = agents.records()
+        yield 'score_reference', rows, lambda: [calculate_agent_score(agent, threat_type, seed=0)
+                                                for agent in records]
+
+    def score_matrix():
+        agents._features = None  # include feature preparation, as on a freshly loaded catalog
+        return score_agents_matrix(agents, threats)
+    yield 'score_matrix_all_threats', rows * len(threats), score_matrix
+
+    yield 'rank_top5', rows, lambda: rank_agents(agents, threat_type, top_n=5, seed=0)
+    yield 'rank_top5_constrained', rows, lambda: rank_agents(agents, threat_type, top_n=5, max_cost=800,
+                                                             min_effectiveness=0.9, seed=0)
+
+    scores = score_agents_matrix(agents, [threat_type])[:, 0]
+    yield 'topk_partition', rows, lambda: top_k_indices(scores, 5)
+    yield 'topk_full_sort', rows, lambda: np.argsort(-scores, kind='stable')[:5]
+
+    # One agent's metrics changing under live telemetry, alternating between two values
+    live = LiveRankings(agents)
+    agent_id = int(agents['id'][0])
+    values = itertools.cycle([0.80, 0.98])
+    yield 'live_update', 1, lambda: live.update(agent_id, effectiveness=next(values))
+
+    # Whole-catalog containment simulation, with fewer trials per agent on large catalogs
+    trials = max(10, min(SIMULATION_TRIALS, SIMULATION_MAX_DRAWS // rows))
+    speed = np.asarray(agents['speed'], dtype=np.float64)
+    p_success = success_probability(agents, threat_type)
+    yield f'simulate_catalog_{trials}_trials', rows * trials, lambda: simulate(speed, p_success, trials, seed=0)
+
+    # Weight sensitivity sweep, with fewer weight vectors on large catalogs
+    vectors = max(10, min(SENSITIVITY_VECTORS, SENSITIVITY_MAX_CELLS // rows))
+    yield f'sensitivity_{vectors}_vectors', rows * vectors, lambda: sensitivity_analysis(
+        agents, threat_type, samples=vectors, seed=0)
+
+
+def bench_rendering():
+    """Simulation, chart and PDF benchmarks on the built-in top-5; yields (name, items, fn)"""
+    from charts import (precompute_radar_traces, radar_comparison_figure, radar_figure, radar_traces,
+                        time_comparison_figure)
+    from engine import AI_AGENTS, RECOMMENDATION_CACHE
+    from playbook import _playbook_rows, _render, _simulation_rows, generate_pdf_playbook
+
+    threat_type = 'ransomware'
+    recommendations = rank_agents(AI_AGENTS, threat_type, top_n=5, seed=0)
+    yield 'simulate_recommendations', len(recommendations) + 1, lambda: simulate_recommendations(
+        AI_AGENTS, threat_type, recommendations, SIMULATION_TRIALS, seed=0)
+    recommendations, simulation = simulate_recommendations(AI_AGENTS, threat_type, recommendations,
+                                                           SIMULATION_TRIALS, seed=0)
+
+    def charts():
+        figures = [radar_figure(rec) for rec in recommendations]
+        figures.append(time_comparison_figure(simulation))
+        return figures
+    yield 'charts_results_view', len(recommendations) + 1, charts
+    yield 'charts_to_json', len(recommendations) + 1, lambda: [fig.to_json() for fig in charts()]
+
+    # The results view as the app draws it: figures cached per catalog version, or one consolidated radar
+    version = RECOMMENDATION_CACHE.version(AI_AGENTS)
+    yield 'charts_radar_traces', len(AI_AGENTS), lambda: radar_traces(AI_AGENTS)
+    precompute_radar_traces(AI_AGENTS)
+    yield 'charts_radar_cached', len(recommendations), lambda: [radar_figure(rec, version) for rec in recommendations]
+    yield 'charts_consolidated', 2, lambda: [radar_comparison_figure(recommendations),
+                                             time_comparison_figure(simulation)]
+    yield 'charts_consolidated_cached', 1, lambda: radar_comparison_figure(recommendations, version)
+    yield 'charts_consolidated_to_json', 2, lambda: [
+        fig.to_json() for fig in (radar_comparison_figure(recommendations, version), time_comparison_figure(simulation))]
+
+    rows, simulation_rows = _playbook_rows(recommendations), _simulation_rows(simulation)
+    yield 'pdf_render', 1, lambda: _render(threat_type, rows, simulation_rows)
+    yield 'pdf_cached', 1, lambda: generate_pdf_playbook(threat_type, recommendations, simulation)
+
+
+def chart_payloads():
+    """Serialized bytes of the results-view charts on the built-in top-5, per-agent vs consolidated radars"""
+    from charts import figure_payload, radar_comparison_figure, radar_figure, time_comparison_figure
+    from engine import AI_AGENTS
+
+    threat_type = 'ransomware'
+    recommendations, simulation = simulate_recommendations(
+        AI_AGENTS, threat_type, rank_agents(AI_AGENTS, threat_type, top_n=5, seed=0), SIMULATION_TRIALS, seed=0)
+    time_bytes = figure_payload(time_comparison_figure(simulation))[0]
+    return {
+        'separate': sum(figure_payload(radar_figure(rec))[0] for rec in recommendations) + time_bytes,
+        'consolidated': figure_payload(radar_comparison_figure(recommendations))[0] + time_bytes
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, repeat=5, seed=0, rendering=True, log=sys.stderr):
+    """Runs every benchmark; returns the JSON-ready report"""
+    results = []
+
+    def record(name, rows, items, fn, repeat):
+        result = {'benchmark': name, 'rows': rows, **measure(fn, repeat, items)}
+        results.append(result)
+        print(f"{name:<28} {rows if rows is not None else '-':>9} rows | "
+              f"median {result['median_s'] * 1000:10.3f} ms | "
+              f"{result['throughput_per_s']:14,.0f} items/s | peak {result['peak_mb']:9.2f} MB", file=log)
+
+    for rows in sizes:
+        start = time.perf_counter()
+        agents = synthetic_catalog(rows, seed)
+        print(f"-- synthetic catalog: {rows:,} agents, {len(agents.categories['coverage'])} coverage sets "
+              f"({time.perf_counter() - start:.2f}s)", file=log)
+        for name, items, fn in bench_catalog(agents):
+            # Keep slow Python-loop references from dominating large runs
+            record(name, rows, items, fn, repeat if rows <= REFERENCE_MAX_ROWS else max(1, min(repeat, 3)))
+
+    payloads = None
+    if rendering:
+        for name, items, fn in bench_rendering():
+            record(name, None, items, fn, repeat)
+        payloads = chart_payloads()
+        print(f"chart payload: {payloads['separate'] / 1024:.1f} KB per-agent radars, "
+              f"{payloads['consolidated'] / 1024:.1f} KB consolidated", file=log)
+
+    return {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'seed': seed,
+        'chart_payload_bytes': payloads,
+        'results': results
+    }
+
+
+def compare(report, baseline, threshold=0.2):
+    """
+    (benchmark, rows, baseline time, current time, ratio) for every result
+    slower than baseline by more than threshold. Compares the fastest run,
+    which is far less noisy than the median for sub-millisecond benchmarks.
+    """
+    previous = {(r['benchmark'], r['rows']): r for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        before = previous.get((result['benchmark'], result['rows']))
+        if before and before['min_s'] > 0:
+            ratio = result['min_s'] / before['min_s']
+            if ratio > 1 + threshold:
+                regressions.append((result['benchmark'], result['rows'], before['min_s'], result['min_s'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CyberAI-Orchestrator benchmark suite")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="synthetic catalog sizes")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument('--seed', type=int, default=0, help="synthetic catalog seed")
+    parser.add_argument('--no-rendering', action='store_true', help="skip chart and PDF benchmarks")
+    parser.add_argument('--output', help="write the report as JSON to this file")
+    parser.add_argument('--compare', help="baseline report to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.repeat, args.seed, rendering=not args.no_rendering)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for name, rows, before, after, ratio in regressions:
+            print(f"REGRESSION {name} ({rows} rows): {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({ratio:.2f}x)",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+CyberAI Orchestrator - Startup Benchmark
+Measures, in fresh interpreters, the cold import time of the decision engine
+and the time to the first recommendation, and checks which heavy libraries
+each entry point drags in.
+
+Usage:
+    python bench_startup.py --repeat 10 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ('pandas', 'plotly', 'fpdf', 'streamlit')
+
+# Runs inside a fresh interpreter; prints one JSON line
+CHILD_TEMPLATE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+from engine import AI_AGENTS, rank_agents
+rank_agents(AI_AGENTS, 'ransomware', top_n=5, seed=0)
+first = time.perf_counter()
+print(json.dumps({{
+    'import_s': imported - start,
+    'first_recommendation_s': first - start,
+    'heavy_modules': [m for m in {heavy!r} if m in sys.modules]
+}}))
+"""
+
+
+def measure(module, repeat):
+    """Cold-start timings of importing module and serving one recommendation"""
+    code = CHILD_TEMPLATE.format(module=module, heavy=HEAVY_MODULES)
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code], cwd=repo_dir,
+                                capture_output=True, text=True, check=True).stdout
+        run = json.loads(output.strip().splitlines()[-1])
+        run['process_s'] = time.perf_counter() - start
+        runs.append(run)
+
+    def summary(key):
+        values = [run[key] for run in runs]
+        return {'median': statistics.median(values), 'min': min(values), 'max': max(values)}
+
+    return {
+        'module': module,
+        'repeat': repeat,
+        'import_s': summary('import_s'),
+        'first_recommendation_s': summary('first_recommendation_s'),
+        'process_s': summary('process_s'),
+        'heavy_modules': runs[-1]['heavy_modules']
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold import / time-to-first-recommendation benchmark")
+    parser.add_argument('--modules', nargs='+', default=['engine', 'triage'], help="entry points to import")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = [measure(module, args.repeat) for module in args.modules]
+    for result in results:
+        print(f"{result['module']:<10} import {result['import_s']['median'] * 1000:8.1f} ms | "
+              f"first recommendation {result['first_recommendation_s']['median'] * 1000:8.1f} ms | "
+              f"process {result['process_s']['median'] * 1000:8.1f} ms | "
+              f"heavy modules: {', '.join(result['heavy_modules']) or 'none'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+CyberAI Orchestrator - External Agent Catalog
+Loads the agent catalog from external columnar files instead of the built-in
+AGENT_RECORDS, with a validated schema and compact dtypes (float32 metrics,
+categorical name/coverage, uint64 coverage bitmask), and reloads it when the
+files change without restarting the app.
+
+Supported sources:
+- a catalog directory: manifest.json plus one .npy file per column, memory-mapped
+  read-only so every process shares the same pages (written by write_catalog)
+- a Parquet (.parquet) or Arrow IPC (.arrow/.feather) file; requires pyarrow
+
+Usage:
+    python catalog.py export catalog_dir/          # built-in agents -> catalog directory
+    python catalog.py convert agents.parquet catalog_dir/
+    python catalog.py validate catalog_dir/
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from engine import AI_AGENTS, AgentCatalog, compile_coverage_masks
+
+MANIFEST = 'manifest.json'
+SCHEMA_VERSION = 1
+
+# column -> on-disk dtype; name and coverage are stored as int32 codes into label lists
+SCHEMA = {
+    'id': np.int64,
+    'name': np.int32,
+    'effectiveness': np.float32,
+    'speed': np.float32,
+    'fp_rate': np.float32,
+    'cost': np.float32,
+    'coverage': np.int32,
+    'coverage_mask': np.uint64
+}
+CATEGORICAL_COLUMNS = ('name', 'coverage')
+REQUIRED_COLUMNS = ('id', 'name', 'effectiveness', 'speed', 'fp_rate', 'cost', 'coverage')
+ARROW_SUFFIXES = ('.arrow', '.feather', '.ipc')
+# Allowed value range of the bounded metric columns
+METRIC_RANGES = {
+    'effectiveness': (0.0, 1.0),
+    'fp_rate': (0.0, 1.0),
+    'speed': (0.0, 10.0)
+}
+
+
+def _categorical(values):
+    """(int32 codes, labels) for a column of strings"""
+    labels, codes = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    return codes.astype(np.int32), labels.astype(object)
+
+
+def validate_columns(columns, categories):
+    """Raises ValueError unless the columns match SCHEMA and hold sane metric values"""
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Catalog is missing columns: {', '.join(missing)}")
+    rows = len(columns['id'])
+    for name, dtype in SCHEMA.items():
+        values = columns[name]
+        if values.dtype != dtype:
+            raise ValueError(f"Column {name!r} has dtype {values.dtype}, expected {np.dtype(dtype)}")
+        if len(values) != rows:
+            raise ValueError(f"Column {name!r} has {len(values)} rows, expected {rows}")
+    for name in CATEGORICAL_COLUMNS:
+        codes = columns[name]
+        if rows and (codes.min() < 0 or codes.max() >= len(categories[name])):
+            raise ValueError(f"Column {name!r} has codes outside its {len(categories[name])} labels")
+
+    for name, (low, high) in METRIC_RANGES.items():
+        values = columns[name]
+        if rows and not (np.all(values >= low) and np.all(values <= high)):
+            raise ValueError(f"Column {name!r} must lie within [{low}, {high}]")
+    if rows and not np.all(columns['cost'] > 0):
+        raise ValueError("Column 'cost' must be positive")
+    if len(np.unique(columns['id'])) != rows:
+        raise ValueError("Column 'id' must be unique")
+
+
+def compact_columns(source):
+    """
+    Converts catalog-like columns (an AgentCatalog, DataFrame or dict of arrays
+    with AGENT_RECORDS fields) to SCHEMA dtypes. Returns (columns, categories).
+    """
+    columns, categories = {}, {}
+    for name in CATEGORICAL_COLUMNS:
+        columns[name], categories[name] = _categorical(source[name])
+    for name in ('id', 'effectiveness', 'speed', 'fp_rate', 'cost'):
+        columns[name] = np.asarray(source[name]).astype(SCHEMA[name])
+    columns['coverage_mask'] = compile_coverage_masks(categories['coverage'])[columns['coverage']]
+    validate_columns(columns, categories)
+    return columns, categories
+
+
+def _column_file(name, values):
+    """Content-addressed file name, so unchanged columns keep their file across writes"""
+    digest = hashlib.blake2b(np.ascontiguousarray(values).tobytes(), digest_size=8).hexdigest()
+    return f"{name}-{digest}.npy"
+
+
+def write_catalog(directory, source=None):
+    """
+    Writes a catalog directory: one .npy per column plus manifest.json. Column
+    files are written first and the manifest is replaced atomically, so readers
+    always see a complete catalog. Files of the previous manifest are kept for
+    one more generation, so a reader that read it just before the swap can
+    still map its columns; older files are removed. Returns the new catalog
+    version.
+    """
+    source = AI_AGENTS if source is None else source
+    columns, categories = compact_columns(source)
+    os.makedirs(directory, exist_ok=True)
+
+    files = {}
+    for name, values in columns.items():
+        files[name] = _column_file(name, values)
+        path = os.path.join(directory, files[name])
+        if not os.path.exists(path):
+            np.save(path + '.tmp.npy', values)
+            os.replace(path + '.tmp.npy', path)
+
+    version = hashlib.blake2b(
+        json.dumps([files, {k: list(v) for k, v in categories.items()}], sort_keys=True).encode(),
+        digest_size=16
+    ).hexdigest()
+    manifest = {
+        'schema_version': SCHEMA_VERSION,
+        'version': version,
+        'rows': len(columns['id']),
+        'columns': {name: {'file': files[name], 'dtype': np.dtype(SCHEMA[name]).name} for name in columns},
+        'categories': {name: list(labels) for name, labels in categories.items()}
+    }
+    try:
+        previous = {spec['file'] for spec in _read_manifest(directory)['columns'].values()}
+    except (OSError, ValueError, KeyError):
+        previous = set()
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.manifest-', suffix='.json')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(directory, MANIFEST))
+
+    referenced = set(files.values()) | previous
+    for entry in os.listdir(directory):
+        if entry.endswith('.npy') and entry not in referenced:
+            os.remove(os.path.join(directory, entry))
+    return version
+
+
+def _read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('schema_version') != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported catalog schema version {manifest.get('schema_version')!r}")
+    return manifest
+
+
+def _load_directory(directory, mapped=None):
+    """
+    Memory-maps a catalog directory. mapped (file name -> array) lets a reload
+    reuse the columns whose files did not change. Returns (catalog, mapped).
+    """
+    mapped = mapped or {}
+    manifest = _read_manifest(directory)
+    columns, reused = {}, {}
+    for name, spec in manifest['columns'].items():
+        values = mapped.get(spec['file'])
+        if values is None:
+            values = np.load(os.path.join(directory, spec['file']), mmap_mode='r')
+        columns[name] = reused[spec['file']] = values
+    categories = {name: np.asarray(labels, dtype=object) for name, labels in manifest['categories'].items()}
+    validate_columns(columns, categories)
+    return AgentCatalog(columns, categories, version=manifest['version']), reused
+
+
+def _load_arrow(path):
+    """Reads a Parquet or Arrow IPC file (memory-mapped) into a compact AgentCatalog"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Loading Parquet/Arrow catalogs requires pyarrow (pip install pyarrow)") from exc
+
+    if path.lower().endswith(ARROW_SUFFIXES):
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+    else:
+        table = pq.read_table(path, memory_map=True)
+
+    source = {}
+    for name in REQUIRED_COLUMNS:
+        if name not in table.column_names:
+            raise ValueError(f"Catalog is missing columns: {name}")
+        source[name] = table.column(name).to_numpy()
+    columns, categories = compact_columns(source)
+    stat = os.stat(path)
+    version = hashlib.blake2b(f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}".encode(),
+                              digest_size=16).hexdigest()
+    return AgentCatalog(columns, categories, version=version)
+
+
+def load_catalog(path):
+    """Loads a catalog directory, Parquet file or Arrow IPC file"""
+    if os.path.isdir(path):
+        return _load_directory(path)[0]
+    return _load_arrow(path)
+
+
+class CatalogStore:
+    """
+    Process-wide handle on an external catalog that reloads it when the source
+    changes. get() checks the source at most every check_interval seconds; for
+    catalog directories only the column files that changed are re-mapped.
+    """
+
+    def __init__(self, path, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._mapped = {}
+        self._stamp = None
+        self._checked_at = 0.0
+        self._catalog = None
+        try:
+            self._reload()
+        except OSError:
+            # The source was rewritten between reading its manifest and mapping the columns
+            self._reload()
+
+    def _source_stamp(self):
+        target = os.path.join(self.path, MANIFEST) if os.path.isdir(self.path) else self.path
+        stat = os.stat(target)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _reload(self):
+        stamp = self._source_stamp()
+        if os.path.isdir(self.path):
+            self._catalog, self._mapped = _load_directory(self.path, self._mapped)
+        else:
+            self._catalog = _load_arrow(self.path)
+        self._stamp = stamp
+        self.reloads += 1
+
+    def get(self):
+        """Current catalog, reloaded first if the source changed since the last check"""
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            with self._lock:
+                self._checked_at = now
+                try:
+                    if self._source_stamp() != self._stamp:
+                        self._reload()
+                except (OSError, ValueError) as exc:
+                    # Keep serving the last good catalog while the source is being rewritten
+                    print(f"Catalog reload failed, keeping version {self._catalog.version}: {exc}",
+                          file=sys.stderr)
+        return self._catalog
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agent catalog export, conversion and validation")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="write the built-in agents as a catalog directory")
+    export.add_argument('directory')
+    convert = commands.add_parser('convert', help="Parquet/Arrow file -> memory-mappable catalog directory")
+    convert.add_argument('source')
+    convert.add_argument('directory')
+    validate = commands.add_parser('validate', help="check a catalog directory or Parquet/Arrow file")
+    validate.add_argument('path')
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        version = write_catalog(args.directory)
+        print(f"Wrote {len(AI_AGENTS)} agents to {args.directory} (version {version})")
+    elif args.command == 'convert':
+        catalog = load_catalog(args.source)
+        version = write_catalog(args.directory, catalog)
+        print(f"Wrote {len(catalog)} agents to {args.directory} (version {version})")
+    else:
+        catalog = load_catalog(args.path)
+        print(f"OK: {len(catalog)} agents, version {catalog.version}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+CyberAI Orchestrator - Result Charts
+Plotly figure builders for the results view, kept free of Streamlit calls so
+they can be benchmarked and reused outside the app. plotly is imported only
+when a figure is built.
+
+Radar chart inputs only change with the catalog, so radar values are
+precomputed per catalog version and radar figures built for a version are
+kept in an LRU cache; pass the catalog version to reuse them across reruns
+and sessions. Cached figures are shared and must not be modified.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from engine import RECOMMENDATION_CACHE
+
+RADAR_CATEGORIES = ['Effectiveness', 'Speed', 'Low FP Rate', 'Cost Efficiency']
+RADAR_COLORS = ['cyan', '#f97316', '#a855f7', '#22c55e', '#eab308', '#ec4899', '#3b82f6', '#ef4444']
+# Radar values are precomputed for catalogs up to this size, and computed per agent on demand beyond it
+RADAR_PRECOMPUTE_ROWS = 10000
+TRACE_CACHE_SIZE = 8      # catalog versions
+FIGURE_CACHE_SIZE = 256   # built radar figures
+
+# catalog version -> radar values per catalog row
+_TRACE_CACHE = OrderedDict()
+# (catalog version, kind, catalog rows) -> plotly Figure
+_FIGURE_CACHE = OrderedDict()
+# Shared by the Streamlit session threads; held only for lookups and inserts, not while building
+_CACHE_LOCK = threading.Lock()
+
+
+def radar_values(rec):
+    """Agent metrics on the radar's 0-100 scale"""
+    return [
+        rec['effectiveness'] * 100,
+        rec['speed'] * 10,
+        (1 - rec['fp_rate']) * 100,
+        (1000 - rec['cost']) / 10
+    ]
+
+
+def radar_traces(agents):
+    """Radar values of every agent in a catalog, indexed by catalog row (one vectorized pass)"""
+    return np.column_stack(radar_values({
+        column: np.asarray(agents[column]) for column in ('effectiveness', 'speed', 'fp_rate', 'cost')
+    })).tolist()
+
+
+def precompute_radar_traces(agents):
+    """radar_traces of a catalog, computed once per catalog version (empty for very large catalogs)"""
+    version = RECOMMENDATION_CACHE.version(agents)
+    with _CACHE_LOCK:
+        traces = _TRACE_CACHE.get(version)
+        if traces is not None:
+            _TRACE_CACHE.move_to_end(version)
+            return traces
+
+    traces = radar_traces(agents) if len(agents) <= RADAR_PRECOMPUTE_ROWS else []
+    with _CACHE_LOCK:
+        _TRACE_CACHE[version] = traces
+        while len(_TRACE_CACHE) > TRACE_CACHE_SIZE:
+            _TRACE_CACHE.popitem(last=False)
+    return traces
+
+
+def _radar(recommendations, values, height, showlegend):
+    """Radar figure with one trace per agent"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure([
+        go.Scatterpolar(
+            r=r,
+            theta=RADAR_CATEGORIES,
+            fill='toself',
+            name=rec['agent'],
+            line_color=RADAR_COLORS[i % len(RADAR_COLORS)],
+            opacity=0.6 if len(recommendations) > 1 else None
+        )
+        for i, (rec, r) in enumerate(zip(recommendations, values))
+    ])
+
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100])
+        ),
+        showlegend=showlegend,
+        height=height,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white', size=10)
+    )
+    return fig
+
+
+def _cached_radar(kind, recommendations, version, build):
+    # Rows, not names: agent names need not be unique within a catalog
+    key = (version, kind, tuple(rec['row'] for rec in recommendations))
+    with _CACHE_LOCK:
+        fig = _FIGURE_CACHE.get(key)
+        if fig is not None:
+            _FIGURE_CACHE.move_to_end(key)
+            return fig
+        traces = _TRACE_CACHE.get(version, [])
+    fig = build([traces[rec['row']] if rec['row'] < len(traces) else radar_values(rec) for rec in recommendations])
+    with _CACHE_LOCK:
+        _FIGURE_CACHE[key] = fig
+        while len(_FIGURE_CACHE) > FIGURE_CACHE_SIZE:
+            _FIGURE_CACHE.popitem(last=False)
+    return fig
+
+
+def radar_figure(rec, version=None):
+    """Radar chart of one recommended agent; cached when the catalog version is given"""
+    build = lambda values: _radar([rec], values, height=250, showlegend=False)
+    if version is None:
+        return build([radar_values(rec)])
+    return _cached_radar('radar', [rec], version, build)
+
+
+def radar_comparison_figure(recommendations, version=None):
+    """
+    All recommended agents overlaid in one radar chart (one trace each),
+    sent to the browser as a single figure instead of one per agent;
+    cached when the catalog version is given
+    """
+    build = lambda values: _radar(recommendations, values, height=420, showlegend=True)
+    if version is None:
+        return build([radar_values(rec) for rec in recommendations])
+    return _cached_radar('comparison', recommendations, version, build)
+
+
+def figure_payload(fig):
+    """(bytes, seconds) to serialize a figure the way st.plotly_chart sends it to the browser"""
+    import plotly.io
+
+    start = time.perf_counter()
+    spec = plotly.io.to_json(fig.to_dict(), validate=False)
+    return len(spec.encode()), time.perf_counter() - start
+
+
+def time_comparison_figure(comparison):
+    """
+    Manual SOC vs orchestrated containment-time percentiles from a
+    simulate_recommendations comparison, with confidence intervals as error bars
+    """
+    import plotly.graph_objects as go
+
+    percentiles = ['p50', 'p90', 'p99']
+    fig = go.Figure()
+    for label, key, color in (('Manual SOC', 'manual', '#ef4444'),
+                              ('CyberAI-Orchestrator', 'orchestrated', '#22c55e')):
+        summary = comparison[key]
+        values = [summary[p] for p in percentiles]
+        fig.add_trace(go.Bar(
+            name=label,
+            x=percentiles,
+            y=values,
+            marker_color=color,
+            text=[f'{v:.0f} min' for v in values],
+            textposition='auto',
+            error_y=dict(
+                type='data',
+                symmetric=False,
+                array=[summary[f'{p}_ci'][1] - summary[p] for p in percentiles],
+                arrayminus=[summary[p] - summary[f'{p}_ci'][0] for p in percentiles]
+            )
+        ))
+
+    fig.update_layout(
+        title=f"Containment Time ({comparison['trials']:,} simulated incidents)",
+        xaxis_title='Percentile',
+        yaxis_title='Time (minutes)',
+        barmode='group',
+        height=300,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white')
+    )
+    return fig
+
+
+def frontier_figure(frontier):
+    """Cost vs effectiveness scatter of Pareto-optimal agents (size: speed, color: FP rate)"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scatter(
+        x=[entry['cost'] for entry in frontier],
+        y=[entry['effectiveness'] * 100 for entry in frontier],
+        mode='markers+text',
+        text=[entry['agent'] for entry in frontier],
+        textposition='top center',
+        marker=dict(
+            size=[entry['speed'] * 4 for entry in frontier],
+            color=[entry['fp_rate'] * 100 for entry in frontier],
+            colorscale='RdYlGn_r',
+            colorbar=dict(title='FP %'),
+            line=dict(color='#0f172a', width=1)
+        ),
+        hovertemplate='%{text}<br>Cost: $%{x:,.0f}<br>Effectiveness: %{y:.0f}%<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title='Monthly Cost ($)',
+        yaxis_title='Effectiveness (%)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        height=400
+    )
+    return fig
@@ -0,0 +1,526 @@
+"""
+CyberAI Orchestrator - Decision Engine
+Agent catalog, threat taxonomy and the scoring / ranking core, importable
+without Streamlit (used by the dashboard in project.py and the triage CLI).
+Only NumPy is imported; pandas is loaded on demand by AgentCatalog.to_frame().
+"""
+
+import hashlib
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from profiling import stage
+
+# AI Agents Database (25+ agents with 2025 performance metrics)
+AGENT_RECORDS = [
+    {"id": 1, "name": "CrowdStrike Falcon XDR", "effectiveness": 0.95, "speed": 8.5, "fp_rate": 0.02, "cost": 850, "coverage": "ransomware,malware,apt,lateral_movement"},
+    {"id": 2, "name": "Darktrace Enterprise Immune", "effectiveness": 0.92, "speed": 9.2, "fp_rate": 0.05, "cost": 920, "coverage": "insider_threat,lateral_movement,data_exfiltration,apt"},
+    {"id": 3, "name": "Microsoft Defender AI", "effectiveness": 0.89, "speed": 7.8, "fp_rate": 0.03, "cost": 680, "coverage": "phishing,malware,ransomware,credential_theft"},
+    {"id": 4, "name": "Vectra AI Cognito", "effectiveness": 0.94, "speed": 9.0, "fp_rate": 0.04, "cost": 890, "coverage": "lateral_movement,c2_communication,data_exfiltration"},
+    {"id": 5, "name": "SentinelOne Singularity", "effectiveness": 0.93, "speed": 8.8, "fp_rate": 0.03, "cost": 780, "coverage": "ransomware,zero_day,malware,apt"},
+    {"id": 6, "name": "Proofpoint Email Defense", "effectiveness": 0.91, "speed": 7.5, "fp_rate": 0.02, "cost": 450, "coverage": "phishing,business_email_compromise,malware"},
+    {"id": 7, "name": "Palo Alto Cortex XDR", "effectiveness": 0.90, "speed": 8.3, "fp_rate": 0.04, "cost": 820, "coverage": "ransomware,malware,apt,zero_day"},
+    {"id": 8, "name": "Splunk UEBA", "effectiveness": 0.87, "speed": 6.5, "fp_rate": 0.06, "cost": 720, "coverage": "insider_threat,credential_theft,privilege_escalation"},
+    {"id": 9, "name": "IBM QRadar SIEM", "effectiveness": 0.85, "speed": 6.8, "fp_rate": 0.05, "cost": 950, "coverage": "apt,compliance_violation,data_exfiltration"},
+    {"id": 10, "name": "Cloudflare Magic Firewall", "effectiveness": 0.88, "speed": 9.5, "fp_rate": 0.03, "cost": 580, "coverage": "ddos,web_attack,bot_attack"},
+    {"id": 11, "name": "Abnormal Security", "effectiveness": 0.93, "speed": 8.0, "fp_rate": 0.02, "cost": 520, "coverage": "business_email_compromise,phishing,account_takeover"},
+    {"id": 12, "name": "Cybereason Defense Platform", "effectiveness": 0.91, "speed": 8.6, "fp_rate": 0.04, "cost": 790, "coverage": "ransomware,malware,apt"},
+    {"id": 13, "name": "Cisco SecureX", "effectiveness": 0.86, "speed": 7.2, "fp_rate": 0.05, "cost": 840, "coverage": "malware,web_attack,c2_communication"},
+    {"id": 14, "name": "Fortinet FortiAI", "effectiveness": 0.89, "speed": 8.1, "fp_rate": 0.04, "cost": 710, "coverage": "ransomware,zero_day,malware"},
+    {"id": 15, "name": "Trellix XDR", "effectiveness": 0.88, "speed": 7.9, "fp_rate": 0.04, "cost": 760, "coverage": "apt,malware,data_exfiltration"},
+    {"id": 16, "name": "Exabeam UEBA", "effectiveness": 0.90, "speed": 7.0, "fp_rate": 0.05, "cost": 690, "coverage": "insider_threat,credential_theft,privilege_escalation"},
+    {"id": 17, "name": "Zscaler Zero Trust", "effectiveness": 0.87, "speed": 8.7, "fp_rate": 0.03, "cost": 620, "coverage": "data_exfiltration,lateral_movement,zero_day"},
+    {"id": 18, "name": "TrendMicro Vision One", "effectiveness": 0.89, "speed": 8.2, "fp_rate": 0.04, "cost": 730, "coverage": "ransomware,malware,phishing"},
+    {"id": 19, "name": "Rapid7 InsightIDR", "effectiveness": 0.86, "speed": 7.4, "fp_rate": 0.05, "cost": 650, "coverage": "insider_threat,lateral_movement,credential_theft"},
+    {"id": 20, "name": "Sophos Intercept X", "effectiveness": 0.88, "speed": 8.0, "fp_rate": 0.03, "cost": 590, "coverage": "ransomware,malware,zero_day"},
+    {"id": 21, "name": "Carbon Black Cloud", "effectiveness": 0.91, "speed": 8.4, "fp_rate": 0.03, "cost": 770, "coverage": "apt,ransomware,malware"},
+    {"id": 22, "name": "Securonix UEBA", "effectiveness": 0.89, "speed": 6.9, "fp_rate": 0.06, "cost": 710, "coverage": "insider_threat,privilege_escalation,data_exfiltration"},
+    {"id": 23, "name": "Symantec Endpoint Security", "effectiveness": 0.87, "speed": 7.7, "fp_rate": 0.04, "cost": 640, "coverage": "malware,ransomware,phishing"},
+    {"id": 24, "name": "Chronicle Security", "effectiveness": 0.90, "speed": 7.6, "fp_rate": 0.04, "cost": 880, "coverage": "apt,c2_communication,data_exfiltration"},
+    {"id": 25, "name": "Arctic Wolf MDR", "effectiveness": 0.92, "speed": 8.3, "fp_rate": 0.03, "cost": 810, "coverage": "ransomware,apt,lateral_movement"}
+]
+
+# Threat Types Database
+THREAT_TYPES = {
+    "ransomware": {"name": "Ransomware Attack", "severity": "CRITICAL", "description": "File encryption with ransom demand"},
+    "phishing": {"name": "Phishing Campaign", "severity": "HIGH", "description": "Credential harvesting via email"},
+    "apt": {"name": "Advanced Persistent Threat", "severity": "CRITICAL", "description": "Long-term targeted intrusion"},
+    "ddos": {"name": "DDoS Attack", "severity": "HIGH", "description": "Distributed denial of service"},
+    "insider_threat": {"name": "Insider Threat", "severity": "HIGH", "description": "Malicious internal actor"},
+    "lateral_movement": {"name": "Lateral Movement", "severity": "CRITICAL", "description": "Network propagation detected"},
+    "data_exfiltration": {"name": "Data Exfiltration", "severity": "CRITICAL", "description": "Unauthorized data transfer"},
+    "malware": {"name": "Malware Infection", "severity": "HIGH", "description": "Malicious software detected"},
+    "zero_day": {"name": "Zero-Day Exploit", "severity": "CRITICAL", "description": "Unknown vulnerability exploitation"},
+    "credential_theft": {"name": "Credential Theft", "severity": "HIGH", "description": "Account credentials compromised"},
+    "business_email_compromise": {"name": "Business Email Compromise", "severity": "CRITICAL", "description": "Executive email account takeover"},
+    "privilege_escalation": {"name": "Privilege Escalation", "severity": "HIGH", "description": "Unauthorized privilege elevation"},
+    "c2_communication": {"name": "C2 Communication", "severity": "CRITICAL", "description": "Command and control traffic"},
+    "web_attack": {"name": "Web Application Attack", "severity": "MEDIUM", "description": "SQL injection or XSS detected"},
+    "bot_attack": {"name": "Bot Attack", "severity": "MEDIUM", "description": "Automated malicious traffic"}
+}
+
+# Threat Coverage Bitmasks & Inverted Index
+THREAT_BITS = {threat: 1 << bit for bit, threat in enumerate(THREAT_TYPES)}
+
+def compile_coverage_masks(coverage_column):
+    """
+    Compiles comma-separated coverage strings once into one bitmask per agent
+    over the THREAT_TYPES keys (unknown threat names are ignored).
+    """
+    if len(THREAT_BITS) > 64:
+        raise ValueError(f"Coverage bitmask supports at most 64 threat types, got {len(THREAT_BITS)}")
+    masks = np.zeros(len(coverage_column), dtype=np.uint64)
+    for row, coverage in enumerate(coverage_column):
+        mask = 0
+        for threat in coverage.split(','):
+            mask |= THREAT_BITS.get(threat.strip(), 0)
+        masks[row] = mask
+    return masks
+
+def coverage_masks(agents):
+    """Returns the precompiled coverage_mask column, compiling it if the catalog has none"""
+    if 'coverage_mask' in agents:
+        return np.asarray(agents['coverage_mask'], dtype=np.uint64)
+    return compile_coverage_masks(agents['coverage'])
+
+def threat_rows(agents, threat_type):
+    """
+    Inverted index lookup: sorted row positions of the agents that cover threat_type
+    directly. Built per threat on first use and memoized per AgentCatalog (every call
+    for a DataFrame); the returned array is read-only.
+    """
+    index = getattr(agents, '_threat_index', None)
+    if index is not None and threat_type in index:
+        return index[threat_type]
+    rows = np.flatnonzero(coverage_masks(agents) & np.uint64(THREAT_BITS[threat_type]))
+    rows.flags.writeable = False
+    if index is not None:
+        index[threat_type] = rows
+    return rows
+
+def top_k_indices(scores, k):
+    """
+    Row positions of the k highest scores, best first, via partial selection.
+    Ties keep catalog order, so the result equals a stable descending sort cut at k.
+    """
+    n = len(scores)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= n:
+        return np.argsort(-scores, kind='stable')
+    kth_largest = np.partition(scores, n - k)[n - k]
+    candidates = np.flatnonzero(scores >= kth_largest)
+    order = np.argsort(-scores[candidates], kind='stable')
+    return candidates[order][:k]
+
+# Columnar Agent Catalog
+class CategoricalColumn:
+    """
+    String column stored as integer codes into a label array. Indexing decodes
+    only the requested rows; np.asarray() decodes the whole column.
+    """
+
+    def __init__(self, codes, labels):
+        self.codes = codes
+        self.labels = np.asarray(labels, dtype=object)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, rows):
+        return self.labels[self.codes[rows]]
+
+    def __iter__(self):
+        return iter(np.asarray(self))
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.labels[np.asarray(self.codes)]
+        return values if dtype is None else values.astype(dtype)
+
+class AgentCatalog:
+    """
+    Column-oriented agent catalog backed by NumPy arrays (possibly memory-mapped).
+    Supports the same agents[column] / len(agents) access as a DataFrame, so every
+    engine function accepts either one, without importing pandas. Columns listed
+    in categories hold integer codes into those labels. Treat catalogs as
+    immutable: derived scoring features and the threat -> agents index are
+    memoized per catalog.
+    """
+
+    STRING_COLUMNS = ('name', 'coverage')
+
+    def __init__(self, columns, categories=None, version=None):
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        self.categories = {name: np.asarray(labels, dtype=object) for name, labels in (categories or {}).items()}
+        self.version = version
+        self._features = None
+        self._threat_index = {}
+        lengths = {len(values) for values in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Catalog columns have different lengths: {sorted(lengths)}")
+        if 'coverage' in self.columns and 'coverage_mask' not in self.columns:
+            self.columns['coverage_mask'] = compile_coverage_masks(self['coverage'])
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds a catalog from a list of agent dicts (the AGENT_RECORDS layout)"""
+        names = list(records[0]) if records else list(AGENT_RECORDS[0])
+        return cls({
+            name: np.array([record[name] for record in records],
+                           dtype=object if name in cls.STRING_COLUMNS else None)
+            for name in names
+        })
+
+    def __getitem__(self, column):
+        if column in self.categories:
+            return CategoricalColumn(self.columns[column], self.categories[column])
+        return self.columns[column]
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def row(self, position):
+        """One agent as a dict of Python scalars (a calculate_agent_score input)"""
+        row = {}
+        for name in self.columns:
+            value = self[name][position]
+            row[name] = value.item() if isinstance(value, np.generic) else value
+        return row
+
+    def records(self):
+        return [self.row(position) for position in range(len(self))]
+
+    def to_frame(self):
+        """pandas DataFrame view for the UI; pandas is imported only here"""
+        import pandas as pd
+        return pd.DataFrame({
+            name: pd.Categorical.from_codes(values, self.categories[name]) if name in self.categories else values
+            for name, values in self.columns.items()
+        })
+
+AI_AGENTS = AgentCatalog.from_records(AGENT_RECORDS)
+
+def _time_jitter(agent_id, seed=None):
+    """
+    Random 3-7 minute term of expected_time. Unseeded draws use the global
+    NumPy RNG; seeded draws depend only on (seed, agent id), so they are reproducible.
+    """
+    if seed is None:
+        return np.random.randint(3, 8)
+    return int(np.random.default_rng([seed, int(agent_id)]).integers(3, 8))
+
+# Scoring Weight Profiles
+# score = effectiveness·w + speed·w + fp_penalty·w + coverage_bonus·w - (cost / 100)·w,
+# where coverage_bonus is 1.0 for direct coverage and indirect_coverage otherwise
+WEIGHT_PROFILES = {
+    'balanced': {'effectiveness': 10, 'speed': 1.2, 'fp_penalty': 0.8, 'coverage': 15, 'cost': 1.0,
+                 'indirect_coverage': 0.3},
+    'containment_first': {'effectiveness': 16, 'speed': 2.0, 'fp_penalty': 0.6, 'coverage': 15, 'cost': 0.5,
+                          'indirect_coverage': 0.3},
+    'low_noise': {'effectiveness': 10, 'speed': 1.0, 'fp_penalty': 1.6, 'coverage': 15, 'cost': 1.0,
+                  'indirect_coverage': 0.3},
+    'budget': {'effectiveness': 10, 'speed': 1.0, 'fp_penalty': 0.8, 'coverage': 15, 'cost': 2.5,
+               'indirect_coverage': 0.3},
+    'strict_coverage': {'effectiveness': 10, 'speed': 1.2, 'fp_penalty': 0.8, 'coverage': 15, 'cost': 1.0,
+                        'indirect_coverage': 0.0}
+}
+DEFAULT_PROFILE = 'balanced'
+WEIGHT_FIELDS = tuple(WEIGHT_PROFILES[DEFAULT_PROFILE])
+
+def resolve_weights(weights=None):
+    """
+    Weights dict for a profile name, a dict of overrides on the default
+    profile, or None (the paper's weights). Raises ValueError for unknown
+    profiles or weight names.
+    """
+    if weights is None:
+        return WEIGHT_PROFILES[DEFAULT_PROFILE]
+    if isinstance(weights, str):
+        if weights not in WEIGHT_PROFILES:
+            raise ValueError(f"Unknown weight profile {weights!r}, expected one of {', '.join(WEIGHT_PROFILES)}")
+        return WEIGHT_PROFILES[weights]
+    unknown = [name for name in weights if name not in WEIGHT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown scoring weights: {', '.join(unknown)}")
+    return {**WEIGHT_PROFILES[DEFAULT_PROFILE], **weights}
+
+def weights_key(weights=None):
+    """Hashable form of resolved weights, for cache keys"""
+    resolved = resolve_weights(weights)
+    return tuple(float(resolved[name]) for name in WEIGHT_FIELDS)
+
+# CyberAI-Orchestrator Scoring Algorithm (2025 Paper Implementation)
+def calculate_agent_score(agent, threat_type, seed=None, weights=None):
+    """
+    Implements the scoring formula from the 2025 research paper:
+    Score = Effectiveness × Speed × (1/FP-rate) × Coverage - Cost_factor
+    Pass a seed for a reproducible expected_time, and a profile name or
+    weights dict to score with other weights (see WEIGHT_PROFILES).
+    """
+    w = resolve_weights(weights)
+    coverage_list = agent['coverage'].split(',')
+    coverage_bonus = 1.0 if threat_type in coverage_list else w['indirect_coverage']
+    fp_penalty = 1 / (agent['fp_rate'] + 0.01)
+    
+    # Weighted scoring formula
+    score = (
+        agent['effectiveness'] * w['effectiveness'] +
+        agent['speed'] * w['speed'] +
+        fp_penalty * w['fp_penalty'] +
+        coverage_bonus * w['coverage'] -
+        (agent['cost'] / 100) * w['cost']
+    )
+    
+    expected_time = int((10 - agent['speed']) * 2 + _time_jitter(agent['id'], seed))
+    confidence = min(99, int(score * 3.5 + 40))
+    
+    return {
+        'agent': agent['name'],
+        'score': max(0, score),
+        'effectiveness': agent['effectiveness'],
+        'speed': agent['speed'],
+        'fp_rate': agent['fp_rate'],
+        'cost': agent['cost'],
+        'coverage': coverage_list,
+        'expected_time': expected_time,
+        'confidence': confidence
+    }
+
+# Vectorized Batch Scoring Engine
+def score_features(agents):
+    """
+    Feature prep: float64 metric arrays and coverage bitmasks pulled from the
+    catalog (computed once per AgentCatalog, every call for a DataFrame).
+    """
+    if getattr(agents, '_features', None) is not None:
+        return agents._features
+    features = {
+        'effectiveness': np.asarray(agents['effectiveness'], dtype=np.float64),
+        'speed': np.asarray(agents['speed'], dtype=np.float64),
+        'fp_rate': np.asarray(agents['fp_rate'], dtype=np.float64),
+        'cost': np.asarray(agents['cost'], dtype=np.float64),
+        'coverage_mask': coverage_masks(agents)
+    }
+    if isinstance(agents, AgentCatalog):
+        agents._features = features
+    return features
+
+def _raw_score_matrix(agents, threat_types, features=None, weights=None):
+    """
+    Unclipped scores for every agent against every threat type, shape (agents × threats).
+    Applies the same formula (and operation order) as calculate_agent_score.
+    """
+    if features is None:
+        features = score_features(agents)
+    w = resolve_weights(weights)
+    cost = features['cost']
+
+    threat_bits = np.array([THREAT_BITS.get(t, 0) for t in threat_types], dtype=np.uint64)
+    covered = (features['coverage_mask'][:, None] & threat_bits[None, :]) != 0
+    coverage_bonus = np.where(covered, 1.0, w['indirect_coverage'])
+
+    fp_penalty = 1 / (features['fp_rate'] + 0.01)
+    base = features['effectiveness'] * w['effectiveness'] + features['speed'] * w['speed'] + fp_penalty * w['fp_penalty']
+    return base[:, None] + coverage_bonus * w['coverage'] - ((cost / 100) * w['cost'])[:, None]
+
+def score_agents_matrix(agents, threat_types=None, weights=None):
+    """
+    Scores the whole agent catalog against one threat, a list of threats,
+    or all THREAT_TYPES (default) as a single array operation.
+    Returns an (agents × threats) matrix equal to calculate_agent_score()['score'].
+    """
+    if threat_types is None:
+        threat_types = list(THREAT_TYPES.keys())
+    elif isinstance(threat_types, str):
+        threat_types = [threat_types]
+    return np.maximum(0, _raw_score_matrix(agents, list(threat_types), weights=weights))
+
+def _agent_columns(agents):
+    """Row-indexable views of the catalog columns needed to build recommendation dicts"""
+    return {
+        column: agents[column] if isinstance(agents, AgentCatalog) else np.asarray(agents[column])
+        for column in ('id', 'name', 'effectiveness', 'speed', 'fp_rate', 'cost', 'coverage')
+    }
+
+def _rank_rows(columns, raw_scores, top_n, max_cost=None, min_effectiveness=None, seed=None):
+    """Builds the top_n recommendation dicts from a raw score column, best first"""
+    eligible = np.ones(len(raw_scores), dtype=bool)
+    if max_cost is not None:
+        eligible &= columns['cost'] <= max_cost
+    if min_effectiveness is not None:
+        eligible &= columns['effectiveness'] >= min_effectiveness
+    rows = np.flatnonzero(eligible)
+    order = rows[top_k_indices(np.maximum(0, raw_scores[rows]), top_n)]
+    return _recommendation_rows(columns, order, raw_scores[order], seed)
+
+def _recommendation_rows(columns, rows, raw_scores, seed=None):
+    """Recommendation dicts for catalog rows (best first) and their raw scores"""
+    recommendations = []
+    for row, score in zip(rows, raw_scores):
+        speed = columns['speed'][row]
+        recommendations.append({
+            'agent': columns['name'][row],
+            'row': int(row),
+            'score': max(0, score),
+            'effectiveness': columns['effectiveness'][row],
+            'speed': speed,
+            'fp_rate': columns['fp_rate'][row],
+            'cost': columns['cost'][row],
+            'coverage': columns['coverage'][row].split(','),
+            'expected_time': int((10 - speed) * 2 + _time_jitter(columns['id'][row], seed)),
+            'confidence': min(99, int(score * 3.5 + 40))
+        })
+    return recommendations
+
+def rank_agents(agents, threat_type, top_n=5, max_cost=None, min_effectiveness=None, seed=None, timer=None,
+                weights=None):
+    """
+    Scores all agents for one threat in a single pass and returns the top_n
+    recommendation dicts (same shape as calculate_agent_score, plus the
+    agent's catalog 'row'), best first.
+    Agents above max_cost or below min_effectiveness are left out; a seed
+    makes the result reproducible and weights picks a WEIGHT_PROFILES entry
+    (or custom weights). An optional StageTimer records the
+    feature_prep / scoring / ranking stages.
+    """
+    with stage(timer, 'feature_prep'):
+        features = score_features(agents)
+        columns = _agent_columns(agents)
+    with stage(timer, 'scoring'):
+        raw_scores = _raw_score_matrix(agents, [threat_type], features, weights)[:, 0]
+    with stage(timer, 'ranking'):
+        return _rank_rows(columns, raw_scores, top_n, max_cost, min_effectiveness, seed)
+
+def recommend_batch(agents, alerts, top_n=5, seed=None, cache=None, weights=None):
+    """
+    Ranks agents for a chunk of alerts. Each alert is a dict with 'threat_type'
+    and optional 'budget' (max monthly cost) / 'min_effectiveness'. The catalog
+    is scored once per distinct threat in the chunk, not once per alert.
+    With a seed and a RecommendationCache, repeated queries skip scoring entirely.
+    """
+    results = [None] * len(alerts)
+    keys = [None] * len(alerts)
+    pending = []
+    for position, alert in enumerate(alerts):
+        if cache is not None and seed is not None:
+            keys[position] = cache.key(agents, alert['threat_type'], top_n, alert.get('budget'),
+                                       alert.get('min_effectiveness'), seed, weights)
+            results[position] = cache.get(keys[position])
+        if results[position] is None:
+            pending.append(position)
+    if not pending:
+        return results
+
+    threats = list(dict.fromkeys(alerts[position]['threat_type'] for position in pending))
+    raw = _raw_score_matrix(agents, threats, weights=weights)
+    column = {threat: col for col, threat in enumerate(threats)}
+    columns = _agent_columns(agents)
+
+    for position in pending:
+        alert = alerts[position]
+        results[position] = _rank_rows(
+            columns,
+            raw[:, column[alert['threat_type']]],
+            top_n,
+            max_cost=alert.get('budget'),
+            min_effectiveness=alert.get('min_effectiveness'),
+            seed=seed
+        )
+        if keys[position] is not None:
+            cache.put(keys[position], results[position])
+    return results
+
+# Deterministic Recommendation Cache
+CATALOG_COLUMNS = ('id', 'name', 'effectiveness', 'speed', 'fp_rate', 'cost', 'coverage')
+
+def catalog_version(agents):
+    """
+    Content hash of the catalog columns used for scoring; changes whenever any agent does.
+    Catalogs loaded from files carry the version recorded when they were written.
+    """
+    if getattr(agents, 'version', None):
+        return agents.version
+    digest = hashlib.blake2b(digest_size=16)
+    for column in CATALOG_COLUMNS:
+        values = np.asarray(agents[column])
+        if values.dtype == object:
+            digest.update('\x1f'.join(map(str, values)).encode())
+        else:
+            digest.update(str(values.dtype).encode())
+            digest.update(np.ascontiguousarray(values).tobytes())
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+class RecommendationCache:
+    """
+    Bounded LRU cache of seeded recommendations keyed on (catalog version,
+    threat type, scoring parameters). A new or reloaded catalog gets a new
+    version, so stale entries are never served and simply age out.
+    Catalog versions are memoized per catalog object; call forget() (or
+    invalidate()) after editing a catalog in place.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+
+    def version(self, agents):
+        """Catalog version of agents, hashed once per catalog object"""
+        memo = self._versions.get(id(agents))
+        if memo is not None and memo[0]() is agents:
+            return memo[1]
+        version = catalog_version(agents)
+        key = id(agents)
+        self._versions[key] = (weakref.ref(agents, lambda _: self._versions.pop(key, None)), version)
+        return version
+
+    def key(self, agents, threat_type, top_n=5, max_cost=None, min_effectiveness=None, seed=0, weights=None):
+        return (self.version(agents), threat_type, top_n, max_cost, min_effectiveness, seed, weights_key(weights))
+
+    def get(self, key):
+        """Cached recommendations for key (as fresh dict copies) or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return [dict(rec) for rec in entry]
+
+    def put(self, key, recommendations):
+        self._entries[key] = [dict(rec) for rec in recommendations]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def recommend(self, agents, threat_type, top_n=5, max_cost=None, min_effectiveness=None, seed=0, weights=None):
+        """Seeded rank_agents() answered from the cache when possible"""
+        key = self.key(agents, threat_type, top_n, max_cost, min_effectiveness, seed, weights)
+        recommendations = self.get(key)
+        if recommendations is None:
+            recommendations = rank_agents(agents, threat_type, top_n, max_cost, min_effectiveness, seed,
+                                          weights=weights)
+            self.put(key, recommendations)
+        return recommendations
+
+    def forget(self, agents):
+        """Drops the memoized version of one catalog, e.g. after an in-place update"""
+        self._versions.pop(id(agents), None)
+
+    def invalidate(self):
+        """Drops all cached results and memoized catalog versions"""
+        self._entries.clear()
+        self._versions.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+RECOMMENDATION_CACHE = RecommendationCache()
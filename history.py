@@ -0,0 +1,405 @@
+"""
+CyberAI Orchestrator - Recommendation History
+Append-only log of recommendation runs (dashboard analyses, triage batches)
+as Parquet files partitioned by day, history_dir/date=YYYY-MM-DD/part-*.parquet,
+with one row per recommended agent. Writes are buffered and flushed in
+batches as new files; existing files are never rewritten.
+
+Queries stream the matching day partitions batch by batch, so aggregates over
+millions of recorded incidents run in bounded memory. Replay re-scores the
+recorded runs under another catalog or weight profile and reports how the
+recommendations would have changed.
+
+Requires pyarrow.
+
+Usage:
+    python history.py top-agents history/ --threat ransomware --since 2026-07-01 --until 2026-09-30
+    python history.py stats history/ --by threat_type
+    python history.py replay history/ --catalog catalog_dir/ --profile budget --output replayed/
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from engine import AI_AGENTS, DEFAULT_PROFILE, RECOMMENDATION_CACHE, WEIGHT_PROFILES, recommend_batch
+
+BATCH_ROWS = 65536       # buffered rows that trigger a flush
+FLUSH_INTERVAL = 30.0    # seconds a row may wait in the buffer (checked on the next record)
+
+# Per-run columns, repeated on each of the run's rows
+RUN_COLUMNS = ('run_id', 'timestamp', 'source', 'threat_type', 'top_n', 'budget', 'min_effectiveness', 'seed',
+               'profile', 'catalog_version')
+# Per-agent columns; a run without any eligible agent is kept as one row with rank 0 and no agent
+AGENT_COLUMNS = ('rank', 'agent', 'score', 'confidence', 'expected_time', 'effectiveness', 'speed', 'fp_rate',
+                 'cost', 'containment_mean', 'containment_p50', 'containment_p90', 'containment_p99')
+STAT_COLUMNS = ('score', 'confidence', 'expected_time', 'cost', 'containment_mean', 'containment_p50',
+                'containment_p90', 'containment_p99')
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("The recommendation history requires pyarrow (pip install pyarrow)") from exc
+    return pa, pc, ds, pq
+
+
+def _schema(pa):
+    """Arrow schema of the history files"""
+    types = {
+        'run_id': pa.string(),
+        'timestamp': pa.timestamp('ms', tz='UTC'),
+        'source': pa.string(),
+        'threat_type': pa.string(),
+        'top_n': pa.int16(),
+        'budget': pa.float64(),
+        'min_effectiveness': pa.float64(),
+        'seed': pa.int64(),
+        'profile': pa.string(),
+        'catalog_version': pa.string(),
+        'rank': pa.int16(),
+        'agent': pa.string(),
+        'confidence': pa.int16(),
+        'expected_time': pa.int32()
+    }
+    return pa.schema([(name, types.get(name, pa.float64())) for name in RUN_COLUMNS + AGENT_COLUMNS])
+
+
+class HistoryWriter:
+    """
+    Buffers recommendation runs and appends them to the history directory as
+    one new Parquet file per day partition and flush. Flushes once batch_rows
+    rows are buffered, when the oldest buffered row is flush_interval seconds
+    old at the next record(), on flush()/close() and at interpreter exit.
+    Thread-safe; several processes may write to the same directory.
+    """
+
+    def __init__(self, path, batch_rows=BATCH_ROWS, flush_interval=FLUSH_INTERVAL):
+        _pyarrow()
+        self.path = path
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.files = 0
+        self.rows_written = 0
+        self._lock = threading.Lock()
+        self._buffer = {}   # day -> {column: values}
+        self._rows = 0
+        self._oldest = None
+        self._sequence = 0
+        atexit.register(self.flush)
+
+    def record(self, threat_type, recommendations, source='app', top_n=None, budget=None, min_effectiveness=None,
+               seed=None, profile=None, catalog_version=None, timestamp=None, run_id=None):
+        """
+        Appends one run: the recommendation dicts of rank_agents (optionally
+        with a 'containment' summary from simulate_recommendations) plus the
+        query that produced them. Returns the run id.
+        """
+        timestamp = timestamp or datetime.now(timezone.utc)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        run_id = run_id or uuid.uuid4().hex
+        run = {
+            'run_id': run_id,
+            'timestamp': timestamp,
+            'source': source,
+            'threat_type': threat_type,
+            'top_n': len(recommendations) if top_n is None else top_n,
+            'budget': budget,
+            'min_effectiveness': min_effectiveness,
+            'seed': seed,
+            'profile': profile,
+            'catalog_version': catalog_version
+        }
+        rows = [(rank, rec) for rank, rec in enumerate(recommendations, 1)] or [(0, None)]
+
+        with self._lock:
+            day = timestamp.astimezone(timezone.utc).date().isoformat()
+            columns = self._buffer.setdefault(day, {name: [] for name in RUN_COLUMNS + AGENT_COLUMNS})
+            for rank, rec in rows:
+                for name in RUN_COLUMNS:
+                    columns[name].append(run[name])
+                containment = (rec or {}).get('containment') or {}
+                columns['rank'].append(rank)
+                for name in AGENT_COLUMNS[1:]:
+                    if name.startswith('containment_'):
+                        columns[name].append(containment.get(name[len('containment_'):]))
+                    else:
+                        columns[name].append(None if rec is None else rec[name])
+            self._rows += len(rows)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if self._rows >= self.batch_rows or time.monotonic() - self._oldest >= self.flush_interval:
+                self._flush()
+        return run_id
+
+    def flush(self):
+        """Writes every buffered row"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        pa, _, _, pq = _pyarrow()
+        schema = _schema(pa)
+        for day, columns in self._buffer.items():
+            table = pa.table(columns, schema=schema)
+            directory = os.path.join(self.path, f"date={day}")
+            os.makedirs(directory, exist_ok=True)
+            self._sequence += 1
+            name = f"part-{time.time_ns()}-{os.getpid()}-{self._sequence:06d}.parquet"
+            # Dot-prefixed files are ignored by readers until the rename publishes them
+            temp = os.path.join(directory, f".{name}.tmp")
+            pq.write_table(table, temp, compression='zstd')
+            os.replace(temp, os.path.join(directory, name))
+            self.files += 1
+            self.rows_written += table.num_rows
+        self._buffer = {}
+        self._rows = 0
+        self._oldest = None
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecommendationHistory:
+    """
+    Read side of a history directory. Every query takes optional since /
+    until days (inclusive ISO dates; only those partitions are read),
+    threat_type and source filters.
+    """
+
+    def __init__(self, path):
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"No recommendation history at {path}")
+        self.path = path
+
+    def _dataset(self):
+        pa, _, ds, _ = _pyarrow()
+        partitioning = ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+        schema = _schema(pa).append(pa.field('date', pa.string()))
+        return ds.dataset(self.path, format='parquet', schema=schema, partitioning=partitioning)
+
+    def _filter(self, since=None, until=None, threat_type=None, source=None, max_rank=None):
+        _, _, ds, _ = _pyarrow()
+        conditions = []
+        if since is not None:
+            conditions.append(ds.field('date') >= str(since))
+        if until is not None:
+            conditions.append(ds.field('date') <= str(until))
+        if threat_type is not None:
+            conditions.append(ds.field('threat_type') == threat_type)
+        if source is not None:
+            conditions.append(ds.field('source') == source)
+        if max_rank is not None:
+            conditions.append(ds.field('rank') <= max_rank)
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def scan(self, columns, since=None, until=None, threat_type=None, source=None, max_rank=None):
+        """Yields Arrow record batches of the selected columns and rows"""
+        yield from self._dataset().to_batches(
+            columns=list(columns), filter=self._filter(since, until, threat_type, source, max_rank)
+        )
+
+    def top_agents(self, threat_type=None, since=None, until=None, source=None, rank=1, limit=10):
+        """(agent, times recommended at rank <= rank) pairs, most frequent first"""
+        _, pc, _, _ = _pyarrow()
+        counts = Counter()
+        for batch in self.scan(['agent', 'rank'], since, until, threat_type, source, max_rank=rank):
+            agents = batch.column('agent').filter(pc.greater_equal(batch.column('rank'), 1))
+            for entry in pc.value_counts(agents).to_pylist():
+                counts[entry['values']] += entry['counts']
+        return counts.most_common(limit)
+
+    def stats(self, by=('threat_type',), since=None, until=None, threat_type=None, source=None):
+        """
+        Per-group run counts and means of STAT_COLUMNS over each run's top
+        recommendation (the agent the prediction was made for), e.g. the
+        average predicted containment time per threat type or per day.
+        """
+        pa, _, _, _ = _pyarrow()
+        by = [by] if isinstance(by, str) else list(by)
+        aggregations = [('run_id', 'count')] + [(name, kind) for name in STAT_COLUMNS for kind in ('sum', 'count')]
+        totals = {}
+        for batch in self.scan(by + ['run_id', 'rank'] + list(STAT_COLUMNS), since, until, threat_type, source,
+                               max_rank=1):
+            # rank 0 rows are runs without recommendations: counted, but with no metrics
+            grouped = pa.Table.from_batches([batch]).group_by(by).aggregate(aggregations).to_pylist()
+            for row in grouped:
+                key = tuple(row[name] for name in by)
+                total = totals.setdefault(key, Counter())
+                for name, value in row.items():
+                    if name not in by and value is not None:
+                        total[name] += value
+
+        results = []
+        for key, total in sorted(totals.items(), key=lambda item: tuple('' if v is None else str(v) for v in item[0])):
+            row = dict(zip(by, key))
+            row['runs'] = total['run_id_count']
+            for name in STAT_COLUMNS:
+                count = total[f'{name}_count']
+                row[f'mean_{name}'] = total[f'{name}_sum'] / count if count else None
+            results.append(row)
+        return results
+
+    def runs(self, since=None, until=None, threat_type=None, source=None):
+        """
+        Yields recorded runs (dict of RUN_COLUMNS plus the recommended
+        'agents', best first), one history file at a time
+        """
+        dataset = self._dataset()
+        expression = self._filter(since, until, threat_type, source)
+        for fragment in dataset.get_fragments(filter=expression):
+            table = fragment.to_table(columns=list(RUN_COLUMNS) + ['rank', 'agent'], filter=expression,
+                                      schema=dataset.schema)
+            columns = table.to_pydict()
+            current = None
+            for position in range(table.num_rows):
+                if current is None or columns['run_id'][position] != current['run_id']:
+                    if current is not None:
+                        yield current
+                    current = {name: columns[name][position] for name in RUN_COLUMNS}
+                    current['agents'] = []
+                if columns['rank'][position] > 0:
+                    current['agents'].append(columns['agent'][position])
+            if current is not None:
+                yield current
+
+    def replay(self, agents=None, weights=None, since=None, until=None, threat_type=None, source=None,
+               writer=None, chunk_size=1000):
+        """
+        Re-scores recorded runs with their original query (threat, top_n,
+        budget, min_effectiveness, seed) under agents. Each run is scored with
+        the profile it was recorded with (DEFAULT_PROFILE if none was), or with
+        weights when given. Returns the
+        number of runs, how many changed top agent, the mean share of
+        recommended agents kept, and per-agent top-1 counts before and after.
+        A HistoryWriter receives the replayed runs (source 'replay', same run
+        id and timestamp, the profile and catalog version actually used) for
+        querying them like the original history.
+        """
+        agents = AI_AGENTS if agents is None else agents
+        catalog_version = RECOMMENDATION_CACHE.version(agents) if writer is not None else None
+        summary = {'runs': 0, 'top1_changed': 0, 'overlap_sum': 0.0}
+        recorded_top, replayed_top = Counter(), Counter()
+
+        def flush(pending):
+            groups = {}
+            for run in pending:
+                profile = (run['profile'] or DEFAULT_PROFILE) if weights is None else None
+                groups.setdefault((run['top_n'], run['seed'], profile), []).append(run)
+            for (top_n, seed, profile), runs in groups.items():
+                used = weights if profile is None else profile
+                alerts = [{'threat_type': run['threat_type'], 'budget': run['budget'],
+                           'min_effectiveness': run['min_effectiveness']} for run in runs]
+                for run, recommendations in zip(runs, recommend_batch(agents, alerts, top_n=top_n, seed=seed,
+                                                                      weights=used)):
+                    names = [rec['agent'] for rec in recommendations]
+                    before = run['agents']
+                    summary['runs'] += 1
+                    summary['top1_changed'] += before[:1] != names[:1]
+                    summary['overlap_sum'] += (len(set(before) & set(names)) / max(len(before), len(names))
+                                               if before or names else 1.0)
+                    recorded_top.update(before[:1])
+                    replayed_top.update(names[:1])
+                    if writer is not None:
+                        writer.record(run['threat_type'], recommendations, source='replay', top_n=top_n,
+                                      budget=run['budget'], min_effectiveness=run['min_effectiveness'], seed=seed,
+                                      profile=used if isinstance(used, str) else None,
+                                      catalog_version=catalog_version,
+                                      timestamp=run['timestamp'], run_id=run['run_id'])
+
+        pending = []
+        for run in self.runs(since, until, threat_type, source):
+            pending.append(run)
+            if len(pending) >= chunk_size:
+                flush(pending)
+                pending = []
+        flush(pending)
+        if writer is not None:
+            writer.flush()
+
+        runs = summary['runs']
+        return {
+            'runs': runs,
+            'top1_changed': summary['top1_changed'],
+            'top1_change_rate': summary['top1_changed'] / runs if runs else 0.0,
+            'mean_overlap': summary['overlap_sum'] / runs if runs else 1.0,
+            'agents': sorted(
+                ({'agent': agent, 'recorded_top1': recorded_top[agent], 'replayed_top1': replayed_top[agent]}
+                 for agent in recorded_top.keys() | replayed_top.keys()),
+                key=lambda entry: -abs(entry['replayed_top1'] - entry['recorded_top1'])
+            )
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recommendation history queries and replay")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, description in (('top-agents', "most recommended agents"),
+                              ('stats', "run counts and mean predicted times per group"),
+                              ('replay', "re-score recorded runs under another catalog or profile")):
+        command = commands.add_parser(name, help=description)
+        command.add_argument('history', help="history directory")
+        command.add_argument('--since', help="first day (YYYY-MM-DD)")
+        command.add_argument('--until', help="last day (YYYY-MM-DD)")
+        command.add_argument('--threat', help="only this threat type")
+        command.add_argument('--source', help="only runs from this source (app, triage, replay)")
+    commands.choices['top-agents'].add_argument('--rank', type=int, default=1, help="count ranks 1..RANK")
+    commands.choices['top-agents'].add_argument('--limit', type=int, default=10, help="agents to list")
+    commands.choices['stats'].add_argument('--by', nargs='+', default=['threat_type'],
+                                           help="grouping columns (e.g. threat_type date agent source profile)")
+    replay = commands.choices['replay']
+    replay.add_argument('--catalog', help="agent catalog directory, Parquet or Arrow file (default: built-in agents)")
+    replay.add_argument('--profile', choices=list(WEIGHT_PROFILES), help="scoring weight profile (default: each run's recorded profile)")
+    replay.add_argument('--output', help="history directory to record the replayed runs in")
+    args = parser.parse_args(argv)
+
+    history = RecommendationHistory(args.history)
+    filters = dict(since=args.since, until=args.until, threat_type=args.threat, source=args.source)
+    start = time.perf_counter()
+    if args.command == 'top-agents':
+        result = [{'agent': agent, 'count': count}
+                  for agent, count in history.top_agents(rank=args.rank, limit=args.limit, **filters)]
+    elif args.command == 'stats':
+        result = history.stats(by=args.by, **filters)
+    else:
+        agents = None
+        if args.catalog:
+            from catalog import load_catalog
+            agents = load_catalog(args.catalog)
+        writer = HistoryWriter(args.output) if args.output else None
+        result = history.replay(agents, args.profile, writer=writer, **filters)
+        if writer is not None:
+            writer.close()
+
+    json.dump(result, sys.stdout, indent=2, default=str)
+    print()
+    print(f"{args.command} finished in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
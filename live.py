@@ -0,0 +1,243 @@
+"""
+CyberAI Orchestrator - Live Agent Rankings
+Keeps the top-k agents of every threat type current while individual agent
+metrics change (live vendor telemetry), without re-scoring the catalog.
+
+An update re-scores only the changed agent, one score per threat type, and a
+threat's ranking is touched only when that agent is or becomes one of its top
+agents. Each threat keeps a sorted list of its best k + slack agents, ordered
+like top_k_indices (score descending, then catalog order). Only when updates
+leave fewer than k tracked agents is the list refilled from a full vectorized
+scoring of that one threat, so rankings always equal a full recompute.
+
+Usage:
+    python live.py telemetry.jsonl                       # top-k changes as JSON lines
+    tail -f telemetry.jsonl | python live.py - --k 5 --catalog catalog_dir/
+
+Each telemetry line names an agent by "agent" (name) or "id" and carries any
+of effectiveness, speed, fp_rate and cost.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+
+import numpy as np
+
+from catalog import METRIC_RANGES
+from engine import (AI_AGENTS, DEFAULT_PROFILE, RECOMMENDATION_CACHE, THREAT_TYPES, WEIGHT_PROFILES, AgentCatalog,
+                    _agent_columns, _raw_score_matrix, _recommendation_rows, catalog_version, resolve_weights,
+                    score_agents_matrix, score_features, top_k_indices)
+
+LIVE_METRICS = ('effectiveness', 'speed', 'fp_rate', 'cost')
+
+
+def _key(raw_score, row):
+    """Sort key of a ranked agent: clipped score descending, then catalog order"""
+    return (-max(0.0, raw_score), row)
+
+
+class LiveRankings:
+    """
+    Private, updatable copy of a catalog with maintained per-threat top-k
+    rankings. update() changes one agent's metrics; top() and recommend()
+    answer from the maintained rankings, identically to rank_agents on the
+    updated catalog. The catalog attribute gets a new version on every
+    update, so version-keyed caches never serve stale results for it.
+    """
+
+    def __init__(self, agents=None, k=5, weights=None, slack=None):
+        agents = AI_AGENTS if agents is None else agents
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.k = k
+        self.capacity = k + (k if slack is None else slack)
+        self.weights = resolve_weights(weights)
+        self.base_version = catalog_version(agents)
+        # Own copy of every column; integer metric columns become float so updates are stored exactly
+        columns = {
+            name: np.array(values, dtype=np.float64 if name in LIVE_METRICS and values.dtype.kind in 'iu' else None)
+            for name, values in agents.columns.items()
+        }
+        self.catalog = AgentCatalog(columns, agents.categories, version=f"{self.base_version}+0")
+        self.features = score_features(self.catalog)
+        self.updates = 0
+        self.refills = 0
+        self._columns = _agent_columns(self.catalog)
+        self._rows_by_id = {int(value): row for row, value in enumerate(self.catalog['id'])}
+        self._rows_by_name = None
+        self._lock = threading.Lock()
+        self._top = {}      # threat type -> sorted [_key(raw score, row)] of its tracked agents
+        self._scores = {}   # threat type -> {row: raw score} of the same agents
+
+        threats = list(THREAT_TYPES)
+        raw = _raw_score_matrix(self.catalog, threats, self.features, self.weights)
+        for column, threat in enumerate(threats):
+            self._refill(threat, raw[:, column])
+        self.refills = 0
+
+    def _refill(self, threat, raw=None):
+        """Rebuilds one threat's tracked agents from a full scoring of the catalog"""
+        if raw is None:
+            raw = _raw_score_matrix(self.catalog, [threat], self.features, self.weights)[:, 0]
+        rows = top_k_indices(np.maximum(0, raw), self.capacity)
+        self._scores[threat] = {int(row): float(raw[row]) for row in rows}
+        self._top[threat] = [_key(score, row) for row, score in self._scores[threat].items()]
+        self.refills += 1
+
+    def _row(self, agent):
+        """Catalog row of an agent given by id (int) or name (str)"""
+        if isinstance(agent, str):
+            if self._rows_by_name is None:
+                self._rows_by_name = {str(name): row for row, name in enumerate(self.catalog['name'])}
+            row = self._rows_by_name.get(agent)
+        else:
+            row = self._rows_by_id.get(int(agent))
+        if row is None:
+            raise ValueError(f"Unknown agent {agent!r}")
+        return row
+
+    def _reposition(self, threat, row, raw_score):
+        """Moves one re-scored agent within a threat's ranking; True if its top-k changed"""
+        top, scores = self._top[threat], self._scores[threat]
+        before = [r for _, r in top[:self.k]]
+        key = _key(raw_score, row)
+        old = scores.pop(row, None)
+        if old is not None:
+            tracks_all = len(top) == len(self.catalog)
+            del top[bisect_left(top, _key(old, row))]
+            # Past the last tracked agent an untracked one may now rank higher, so let it go
+            if tracks_all or (top and key < top[-1]):
+                insort(top, key)
+                scores[row] = raw_score
+        elif top and key < top[-1]:
+            insort(top, key)
+            scores[row] = raw_score
+            if len(top) > self.capacity:
+                del scores[top.pop()[1]]
+
+        if len(top) < min(self.k, len(self.catalog)):
+            self._refill(threat)
+        return [r for _, r in top[:self.k]] != before
+
+    def update(self, agent, **metrics):
+        """
+        Sets effectiveness / speed / fp_rate / cost of one agent (by id or name)
+        and updates every threat ranking. Returns the threat types whose top-k
+        agents or their order changed.
+        """
+        unknown = [name for name in metrics if name not in LIVE_METRICS]
+        if unknown:
+            raise ValueError(f"Cannot update {', '.join(unknown)}; live metrics are {', '.join(LIVE_METRICS)}")
+        for name, value in metrics.items():
+            if name == 'cost':
+                if not value > 0:
+                    raise ValueError("cost must be positive")
+            elif not METRIC_RANGES[name][0] <= value <= METRIC_RANGES[name][1]:
+                raise ValueError(f"{name} must lie within {list(METRIC_RANGES[name])}")
+
+        with self._lock:
+            row = self._row(agent)
+            for name, value in metrics.items():
+                column = self.catalog.columns[name]
+                column[row] = value
+                # Scoring reads the stored (possibly float32) value, as a full recompute would
+                self.features[name][row] = column[row]
+            self.updates += 1
+            self.catalog.version = f"{self.base_version}+{self.updates}"
+            RECOMMENDATION_CACHE.forget(self.catalog)
+
+            threats = list(THREAT_TYPES)
+            features = {name: values[row:row + 1] for name, values in self.features.items()}
+            raw = _raw_score_matrix(None, threats, features, self.weights)[0]
+            return [threat for threat, score in zip(threats, raw) if self._reposition(threat, row, float(score))]
+
+    def _top_rows(self, threat_type, n):
+        n = self.k if n is None else n
+        if n > self.k:
+            raise ValueError(f"Only the top {self.k} agents are maintained")
+        return [row for _, row in self._top[threat_type][:n]]
+
+    def top(self, threat_type, n=None):
+        """Catalog rows of the n (default k) best agents for a threat, best first"""
+        with self._lock:
+            return self._top_rows(threat_type, n)
+
+    def recommend(self, threat_type, top_n=None, seed=None):
+        """Recommendation dicts equal to rank_agents(self.catalog, threat_type, top_n, seed=seed)"""
+        with self._lock:
+            rows = self._top_rows(threat_type, top_n)
+            scores = [self._scores[threat_type][row] for row in rows]
+            return _recommendation_rows(self._columns, rows, scores, seed)
+
+    def verify(self):
+        """Threat types whose maintained top-k differs from a full recompute (empty when consistent)"""
+        with self._lock:
+            # A new catalog object over the same columns, so features are re-derived from scratch
+            fresh = AgentCatalog(self.catalog.columns, self.catalog.categories)
+            scores = score_agents_matrix(fresh, list(THREAT_TYPES), self.weights)
+            return [
+                threat for column, threat in enumerate(THREAT_TYPES)
+                if self._top_rows(threat, None) != top_k_indices(scores[:, column], self.k).tolist()
+            ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain per-threat agent rankings from live metric updates")
+    parser.add_argument('input', nargs='?', default='-', help="telemetry JSONL file, '-' for stdin")
+    parser.add_argument('--k', type=int, default=5, help="agents ranked per threat type")
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, choices=list(WEIGHT_PROFILES),
+                        help="scoring weight profile")
+    parser.add_argument('--catalog', help="agent catalog directory, Parquet or Arrow file (default: built-in agents)")
+    parser.add_argument('--verify', action='store_true', help="check every ranking against a full recompute at the end")
+    args = parser.parse_args(argv)
+
+    agents = None
+    if args.catalog:
+        from catalog import load_catalog
+        agents = load_catalog(args.catalog)
+    live = LiveRankings(agents, k=args.k, weights=args.profile)
+    names = live.catalog['name']
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    start = time.perf_counter()
+    try:
+        for line_no, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                agent = record['agent'] if 'agent' in record else record['id']
+                changed = live.update(agent, **{name: float(record[name]) for name in LIVE_METRICS if name in record})
+            except (KeyError, TypeError, ValueError) as exc:
+                print(f"Skipping update {line_no}: {exc}", file=sys.stderr)
+                continue
+            for threat in changed:
+                print(json.dumps({
+                    'update': live.updates,
+                    'agent': agent,
+                    'threat_type': threat,
+                    'top': [names[row] for row in live.top(threat)]
+                }), flush=True)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    elapsed = time.perf_counter() - start
+    rate = live.updates / elapsed if elapsed > 0 else float('inf')
+    print(f"Applied {live.updates} updates in {elapsed:.2f}s ({rate:,.0f} updates/s, "
+          f"{live.refills} ranking refills)", file=sys.stderr)
+    if args.verify:
+        mismatched = live.verify()
+        if mismatched:
+            print(f"Rankings differ from a full recompute for: {', '.join(mismatched)}", file=sys.stderr)
+            return 1
+        print("All rankings match a full recompute", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
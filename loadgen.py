@@ -0,0 +1,185 @@
+"""
+CyberAI Orchestrator - Service Load Generator
+Replays synthetic (or recorded) alert traffic against service.py and reports
+throughput, status counts and latency percentiles.
+
+Each of --concurrency clients keeps one keep-alive connection and sends its
+next request as soon as the previous one is answered (closed loop); --rate
+caps the combined request rate instead (open loop, like an alert storm).
+
+Usage:
+    python loadgen.py --requests 20000 --concurrency 200
+    python loadgen.py --unix /tmp/cyberai.sock --rate 2000 --duration 30 --output load.json
+    python loadgen.py --alerts alerts.jsonl --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+
+from engine import THREAT_TYPES
+
+
+def synthetic_alerts(count, seed=0):
+    """Random alert payloads: uniform threat mix, some with budgets and effectiveness floors"""
+    rng = np.random.default_rng(seed)
+    threats = list(THREAT_TYPES)
+    alerts = []
+    for i in range(count):
+        alert = {'id': str(i), 'threat_type': threats[rng.integers(len(threats))]}
+        if rng.random() < 0.3:
+            alert['budget'] = float(rng.choice([500, 700, 900, 1200]))
+        if rng.random() < 0.2:
+            alert['min_effectiveness'] = float(rng.choice([0.85, 0.9]))
+        alerts.append(alert)
+    return alerts
+
+
+def recorded_alerts(path):
+    """Alert payloads from a JSONL/CSV file, in the triage.py format"""
+    from triage import read_alerts
+
+    with open(path, newline='', encoding='utf-8') as f:
+        fmt = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+        return [{k: v for k, v in alert.items() if v is not None} for alert in read_alerts(f, fmt)]
+
+
+async def _open(host, port, unix_path):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def _post(reader, writer, payload):
+    """One POST /recommend on an open connection; returns the status code"""
+    body = json.dumps(payload).encode()
+    writer.write(b"POST /recommend HTTP/1.1\r\nHost: cyberai\r\nContent-Type: application/json\r\n"
+                 b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def run_load(alerts, host='127.0.0.1', port=8080, unix_path=None, concurrency=100,
+                   rate=None, duration=None, top_n=5, seed=None, deadline_ms=None):
+    """
+    Sends the alerts (cycling while --duration lasts) and returns a summary dict
+    with throughput, per-status counts and latency percentiles in milliseconds.
+    """
+    # Closed loop: clients pull as they finish, so only open-loop requests wait in this queue
+    queue = asyncio.Queue(maxsize=0 if rate else concurrency)
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    stop_at = start + duration if duration else None
+
+    async def produce():
+        interval = 1.0 / rate if rate else 0.0
+        sent = 0
+        while True:
+            if stop_at is None and sent == len(alerts):
+                break
+            if stop_at is not None and time.perf_counter() >= stop_at:
+                break
+            payload = {**alerts[sent % len(alerts)], 'top_n': top_n}
+            if seed is not None:
+                payload['seed'] = seed
+            if deadline_ms is not None:
+                payload['deadline_ms'] = deadline_ms
+            await queue.put((time.perf_counter() if interval else None, payload))
+            sent += 1
+            if interval:
+                # Open loop: hold the schedule even when responses fall behind
+                delay = start + sent * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def client():
+        reader, writer = await _open(host, port, unix_path)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                # Open loop measures from the scheduled send time, so falling behind shows up as latency
+                scheduled, payload = item
+                if scheduled is None:
+                    scheduled = time.perf_counter()
+                try:
+                    status = await _post(reader, writer, payload)
+                except (ConnectionError, asyncio.IncompleteReadError, IndexError):
+                    status = 0
+                    writer.close()
+                    reader, writer = await _open(host, port, unix_path)
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(time.perf_counter() - scheduled)
+        finally:
+            writer.close()
+
+    await asyncio.gather(produce(), *(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    values = np.asarray(latencies) * 1000
+    percentiles = dict(zip(('p50_ms', 'p90_ms', 'p99_ms', 'max_ms'),
+                           (np.percentile(values, [50, 90, 99]).round(3).tolist() + [round(values.max(), 3)])
+                           if len(values) else [None] * 4))
+    total = sum(statuses.values())
+    return {
+        'requests': total,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(total / elapsed, 1) if elapsed > 0 else None,
+        'concurrency': concurrency,
+        'target_rate': rate,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        **percentiles
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the CyberAI recommendation service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', help="connect to this Unix socket instead of TCP")
+    parser.add_argument('--alerts', help="replay alerts from a JSONL/CSV file instead of synthetic ones")
+    parser.add_argument('--requests', type=int, default=10000, help="synthetic alerts to send")
+    parser.add_argument('--duration', type=float, help="keep cycling the alerts for this many seconds")
+    parser.add_argument('--concurrency', type=int, default=100, help="parallel client connections")
+    parser.add_argument('--rate', type=float, help="target requests/s across all clients (open loop)")
+    parser.add_argument('--top-n', type=int, default=5)
+    parser.add_argument('--seed', type=int, help="send seeded requests (served from the service cache)")
+    parser.add_argument('--deadline-ms', type=float, help="per-request deadline sent to the service")
+    parser.add_argument('--traffic-seed', type=int, default=0, help="seed for the synthetic alert mix")
+    parser.add_argument('--output', help="write the summary as JSON to this file")
+    args = parser.parse_args(argv)
+
+    alerts = recorded_alerts(args.alerts) if args.alerts else synthetic_alerts(args.requests, args.traffic_seed)
+    summary = asyncio.run(run_load(alerts, args.host, args.port, args.unix, concurrency=args.concurrency,
+                                   rate=args.rate, duration=args.duration, top_n=args.top_n,
+                                   seed=args.seed, deadline_ms=args.deadline_ms))
+
+    print(f"{summary['requests']} requests in {summary['elapsed_s']:.2f}s "
+          f"({summary['throughput_rps']:,.0f} req/s) | statuses {summary['statuses']} | "
+          f"p50 {summary['p50_ms']} ms | p90 {summary['p90_ms']} ms | p99 {summary['p99_ms']} ms")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+CyberAI Orchestrator - Pareto Frontier (Skyline) Queries
+Finds the agents that are non-dominated for a threat across effectiveness
+(higher is better), speed (higher), false-positive rate (lower) and cost
+(lower), instead of collapsing the trade-offs into one weighted score.
+
+The skyline uses sort-filter-skyline: points are presorted by a monotone key
+(O(n log n)), so no point can be dominated by one that comes after it; each
+block of points is then checked, vectorized, only against the skyline found so
+far and within the block, never against the whole catalog pairwise.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from engine import AI_AGENTS, RECOMMENDATION_CACHE, THREAT_TYPES, _raw_score_matrix, threat_rows
+
+# (column, +1 if higher is better / -1 if lower is better)
+SKYLINE_METRICS = (('effectiveness', 1), ('speed', 1), ('fp_rate', -1), ('cost', -1))
+FRONTIER_CACHE_SIZE = 8
+
+# catalog version -> {threat_type: frontier row positions}
+_FRONTIER_CACHE = OrderedDict()
+# Shared by the Streamlit session threads; held only for lookups and inserts, not while computing
+_FRONTIER_LOCK = threading.Lock()
+
+
+def _dominated_by(points, others):
+    """dominated[i, j]: others[j] dominates points[i] (>= everywhere, not identical)"""
+    at_least = others[None, :, 0] >= points[:, None, 0]
+    identical = others[None, :, 0] == points[:, None, 0]
+    for j in range(1, points.shape[1]):
+        at_least &= others[None, :, j] >= points[:, None, j]
+        identical &= others[None, :, j] == points[:, None, j]
+    return at_least & ~identical
+
+
+def skyline(points, block_size=512):
+    """
+    Row positions of the non-dominated rows of points (n × d, larger is better
+    in every dimension), in presort order. Rows equal in every dimension do
+    not dominate each other and are all kept.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n, d = points.shape
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    # Normalized sum, then lexicographic: if p dominates q, p sorts first
+    span = np.ptp(points, axis=0)
+    normalized = (points - points.min(axis=0)) / np.where(span > 0, span, 1)
+    keys = [-points[:, j] for j in reversed(range(d))] + [-normalized.sum(axis=1)]
+    order = np.lexsort(keys)
+
+    frontier = np.empty((0, d))
+    frontier_rows = []
+    for start in range(0, n, block_size):
+        rows = order[start:start + block_size]
+        block = points[rows]
+        if len(frontier):
+            survivors = ~_dominated_by(block, frontier).any(axis=1)
+            rows, block = rows[survivors], block[survivors]
+        # Within the block a row can only be dominated by an earlier one, but checking all is as cheap
+        keep = ~_dominated_by(block, block).any(axis=1)
+        frontier = np.vstack([frontier, block[keep]])
+        frontier_rows.extend(rows[keep])
+    return np.asarray(frontier_rows, dtype=np.intp)
+
+
+def _oriented_metrics(agents):
+    """Skyline metrics of every agent, negated where lower is better"""
+    return np.column_stack([
+        sign * np.asarray(agents[column], dtype=np.float64) for column, sign in SKYLINE_METRICS
+    ])
+
+
+def precompute_frontiers(agents=None):
+    """
+    Frontier row positions for every THREAT_TYPES entry, among the agents that
+    cover the threat directly. Cached per catalog version.
+    """
+    agents = AI_AGENTS if agents is None else agents
+    version = RECOMMENDATION_CACHE.version(agents)
+    with _FRONTIER_LOCK:
+        frontiers = _FRONTIER_CACHE.get(version)
+        if frontiers is not None:
+            _FRONTIER_CACHE.move_to_end(version)
+            return frontiers
+
+    metrics = _oriented_metrics(agents)
+    frontiers = {}
+    for threat_type in THREAT_TYPES:
+        rows = threat_rows(agents, threat_type)
+        frontiers[threat_type] = np.sort(rows[skyline(metrics[rows])])
+
+    with _FRONTIER_LOCK:
+        _FRONTIER_CACHE[version] = frontiers
+        while len(_FRONTIER_CACHE) > FRONTIER_CACHE_SIZE:
+            _FRONTIER_CACHE.popitem(last=False)
+    return frontiers
+
+
+def pareto_frontier(agents, threat_type, max_cost=None, min_effectiveness=None,
+                    max_fp_rate=None, min_speed=None):
+    """
+    Pareto-optimal agents for threat_type as dicts, cheapest first.
+
+    The constraints all point the same way as dominance (anything dominating a
+    point that meets them meets them too), so the constrained skyline is the
+    cached frontier filtered by the constraints, with no new skyline pass.
+    """
+    agents = AI_AGENTS if agents is None else agents
+    rows = precompute_frontiers(agents)[threat_type]
+
+    keep = np.ones(len(rows), dtype=bool)
+    limits = (('cost', max_cost, np.less_equal), ('effectiveness', min_effectiveness, np.greater_equal),
+              ('fp_rate', max_fp_rate, np.less_equal), ('speed', min_speed, np.greater_equal))
+    for column, limit, compare in limits:
+        if limit is not None:
+            keep &= compare(np.asarray(agents[column])[rows], limit)
+    rows = rows[keep]
+
+    scores = np.maximum(0, _raw_score_matrix(agents, [threat_type])[rows, 0]) if len(rows) else []
+    frontier = [
+        {
+            'agent': agents['name'][row],
+            'effectiveness': float(agents['effectiveness'][row]),
+            'speed': float(agents['speed'][row]),
+            'fp_rate': float(agents['fp_rate'][row]),
+            'cost': float(agents['cost'][row]),
+            'score': float(score)
+        }
+        for row, score in zip(rows, scores)
+    ]
+    return sorted(frontier, key=lambda entry: (entry['cost'], -entry['effectiveness']))
@@ -0,0 +1,164 @@
+"""
+CyberAI Orchestrator - Multi-Threat Portfolio Optimizer
+Chooses the set of agents that covers every threat of a multi-stage incident
+within a monthly budget while maximizing the combined score.
+
+Utility is the sum, over the requested threats, of the calculate_agent_score
+score of the agent handling that threat; each threat must be handled by an
+agent that covers it directly. The search is an exact DP over coverage
+bitmasks: states are the subsets of threats already handled, and each state
+keeps a Pareto front of (cost, utility) so the budget is respected without
+enumerating agent combinations.
+
+The search is exact but grows with the number of threat groups the agents
+cover, which on catalogs of tens of thousands of agents and many threats
+takes seconds. max_candidates bounds it: only each threat's max_candidates
+best-scoring agents plus its (cost, score) Pareto-optimal agents are
+considered, and the result is marked 'exact': False when that dropped any.
+"""
+
+import numpy as np
+
+from engine import AI_AGENTS, THREAT_BITS, _raw_score_matrix, threat_rows
+
+
+def _submasks(mask):
+    """All non-empty submasks of mask"""
+    sub = mask
+    while sub:
+        yield sub
+        sub = (sub - 1) & mask
+
+
+def _pareto_front(costs, utilities):
+    """Positions of the (cost, utility) points not dominated by a cheaper-or-equal, better-or-equal one"""
+    order = np.lexsort((-utilities, costs))
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], utilities[order][:-1])))
+    return order[utilities[order] > best_before]
+
+
+def _candidate_rows(scores, costs, local_masks, max_candidates):
+    """Rows of each threat's top max_candidates covering agents and its cost/score Pareto front"""
+    keep = np.zeros(len(costs), dtype=bool)
+    for bit in range(scores.shape[1]):
+        rows = np.flatnonzero(local_masks >> bit & 1)
+        top = rows[np.argsort(-scores[rows, bit], kind='stable')[:max_candidates]]
+        keep[top] = True
+        keep[rows[_pareto_front(costs[rows], scores[rows, bit])]] = True
+    return np.flatnonzero(keep)
+
+
+def _group_options(local_masks, scores, costs):
+    """
+    For every threat group S that some agent covers entirely: the Pareto-optimal
+    (cost, utility, agent row) choices for handling all of S with one agent.
+    """
+    groups = set()
+    for mask in np.unique(local_masks):
+        groups.update(_submasks(int(mask)))
+
+    options = {}
+    for group in groups:
+        rows = np.flatnonzero((local_masks & group) == group)
+        group_bits = [bit for bit in range(scores.shape[1]) if group >> bit & 1]
+        utilities = scores[np.ix_(rows, group_bits)].sum(axis=1)
+        keep = _pareto_front(costs[rows], utilities)
+        options[group] = [(float(costs[rows[i]]), float(utilities[i]), int(rows[i])) for i in keep]
+    return options
+
+
+def _merge_front(front, candidate):
+    """Inserts (cost, utility, ...) into a Pareto front sorted by cost, dropping dominated points"""
+    cost, utility = candidate[0], candidate[1]
+    for other in front:
+        if other[0] <= cost and other[1] >= utility:
+            return front
+    front = [other for other in front if not (cost <= other[0] and utility >= other[1])]
+    front.append(candidate)
+    front.sort(key=lambda point: point[0])
+    return front
+
+
+def optimize_portfolio(threat_types, budget, agents=None, max_candidates=None):
+    """
+    Best agent portfolio for a set of concurrent threats under a monthly budget.
+    Returns a dict with the chosen agents, the threat -> agent assignment,
+    total cost and utility; 'feasible' is False (and 'uncovered' lists threats
+    nobody covers) when no portfolio fits. With max_candidates, the search is
+    limited to each threat's best agents (see module docstring).
+    """
+    agents = AI_AGENTS if agents is None else agents
+    threats = list(dict.fromkeys(threat_types))
+    unknown = [t for t in threats if t not in THREAT_BITS]
+    if unknown:
+        raise ValueError(f"Unknown threat types: {', '.join(unknown)}")
+
+    scores = np.maximum(0, _raw_score_matrix(agents, threats))
+    costs = np.asarray(agents['cost'], dtype=np.float64)
+    local_masks = np.zeros(len(agents), dtype=np.int64)
+    for bit, threat in enumerate(threats):
+        local_masks[threat_rows(agents, threat)] |= 1 << bit
+
+    full = (1 << len(threats)) - 1
+    result = {'threats': threats, 'budget': budget, 'feasible': False, 'agents': [],
+              'assignment': {}, 'total_cost': 0.0, 'utility': 0.0, 'uncovered': [], 'exact': True}
+    covered = int(np.bitwise_or.reduce(local_masks)) if len(local_masks) else 0
+    result['uncovered'] = [t for bit, t in enumerate(threats) if not covered >> bit & 1]
+    if result['uncovered'] or not threats:
+        result['feasible'] = not threats
+        return result
+
+    candidates = np.arange(len(costs))
+    if max_candidates is not None:
+        candidates = _candidate_rows(scores, costs, local_masks, max_candidates)
+        result['exact'] = len(candidates) == np.count_nonzero(local_masks)
+    options = _group_options(local_masks[candidates], scores[candidates], costs[candidates])
+    options = {group: [(cost, utility, int(candidates[row])) for cost, utility, row in points]
+               for group, points in options.items()}
+    # A group that extends a state must contain its lowest unhandled threat as its own lowest bit,
+    # so indexing groups by lowest bit builds each partition of the threats exactly once
+    groups_by_lowest = {}
+    for group in options:
+        groups_by_lowest.setdefault(group & -group, []).append(group)
+
+    # dp[state] = Pareto front of (cost, utility, parent point, group, agent row)
+    dp = {0: [(0.0, 0.0, None, 0, -1)]}
+    for state in range(full):
+        front = dp.get(state)
+        if not front:
+            continue
+        remaining = full ^ state
+        for group in groups_by_lowest.get(remaining & -remaining, ()):
+            if group & state:
+                continue
+            target = state | group
+            for cost, utility, row in options[group]:
+                for point in front:
+                    total = point[0] + cost
+                    if total <= budget:
+                        dp[target] = _merge_front(dp.get(target, []), (total, point[1] + utility, point, group, row))
+
+    if not dp.get(full):
+        return result
+
+    # Highest utility, then lowest cost
+    point = max(dp[full], key=lambda p: (p[1], -p[0]))
+    assignment = {}
+    while point[2] is not None:
+        _, _, parent, group, row = point
+        for bit, threat in enumerate(threats):
+            if group >> bit & 1:
+                assignment[threat] = row
+        point = parent
+
+    rows = sorted(set(assignment.values()), key=lambda r: -costs[r])
+    names = np.asarray(agents['name'])
+    result.update(
+        feasible=True,
+        agents=[{'agent': names[r], 'cost': float(costs[r]),
+                 'threats': [t for t in threats if assignment[t] == r]} for r in rows],
+        assignment={t: names[r] for t, r in assignment.items()},
+        total_cost=float(costs[rows].sum()),
+        utility=float(sum(scores[assignment[t], bit] for bit, t in enumerate(threats)))
+    )
+    return result
@@ -0,0 +1,117 @@
+"""
+CyberAI Orchestrator - Pipeline Stage Timing
+Lightweight per-request stage timers for the decision pipeline (catalog load,
+feature prep, scoring, ranking, rendering, PDF) with JSON-lines and
+Prometheus text-format export.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+class StageTimer:
+    """Wall-clock durations (seconds) of the named stages of one request"""
+
+    def __init__(self, **labels):
+        self.labels = labels
+        self.stages = {}
+        self.started_at = datetime.now(timezone.utc)
+
+    @contextmanager
+    def stage(self, name):
+        """Times the enclosed block; repeated stages accumulate"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        """Records seconds against a stage measured elsewhere"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @property
+    def total(self):
+        return sum(self.stages.values())
+
+    def as_record(self):
+        """Structured metrics for one request, ready for a JSON line"""
+        return {
+            'timestamp': self.started_at.isoformat(),
+            **self.labels,
+            'stages': {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            'total': round(self.total, 6)
+        }
+
+    def to_json_line(self):
+        return json.dumps(self.as_record(), default=str)
+
+
+def stage(timer, name):
+    """timer.stage(name), or a no-op context when no timer is attached"""
+    return nullcontext() if timer is None else timer.stage(name)
+
+
+def append_jsonl(path, timer):
+    """Appends one request's metrics to a JSON-lines file"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(timer.to_json_line() + '\n')
+
+
+class MetricsRegistry:
+    """Process-wide running totals of stage timings, rendered as Prometheus text"""
+
+    def __init__(self, prefix='cyberai'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._sums = {}
+        self._counts = {}
+        self._last = {}
+        self.requests = 0
+
+    def observe(self, timer):
+        with self._lock:
+            self.requests += 1
+            for name, seconds in timer.stages.items():
+                self._sums[name] = self._sums.get(name, 0.0) + seconds
+                self._counts[name] = self._counts.get(name, 0) + 1
+                self._last[name] = seconds
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (suitable for the node_exporter textfile collector)"""
+        p = self.prefix
+        with self._lock:
+            lines = [
+                f'# HELP {p}_stage_seconds Duration of decision pipeline stages.',
+                f'# TYPE {p}_stage_seconds summary',
+            ]
+            for name in sorted(self._sums):
+                lines.append(f'{p}_stage_seconds_sum{{stage="{name}"}} {self._sums[name]:.6f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{name}"}} {self._counts[name]}')
+            lines += [
+                f'# HELP {p}_stage_last_seconds Duration of each stage in the most recent request.',
+                f'# TYPE {p}_stage_last_seconds gauge',
+            ]
+            for name in sorted(self._last):
+                lines.append(f'{p}_stage_last_seconds{{stage="{name}"}} {self._last[name]:.6f}')
+            lines += [
+                f'# HELP {p}_requests_total Analyses timed since process start.',
+                f'# TYPE {p}_requests_total counter',
+                f'{p}_requests_total {self.requests}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Atomically replaces path with the current metrics so scrapers never see a partial file"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.prom')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+METRICS = MetricsRegistry()
@@ -6,13 +6,20 @@ Course: Information Security - BCS-6A
 """
 
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime
+import os
 import time
-from fpdf import FPDF
+
+from catalog import CatalogStore
+from charts import (figure_payload, frontier_figure, precompute_radar_traces, radar_comparison_figure, radar_figure,
+                    time_comparison_figure)
+from engine import AI_AGENTS, DEFAULT_PROFILE, THREAT_TYPES, RECOMMENDATION_CACHE, WEIGHT_PROFILES, rank_agents
+from pareto import pareto_frontier, precompute_frontiers
+from playbook import generate_pdf_playbook, playbook_filename
+from portfolio import optimize_portfolio
+from profiling import METRICS, StageTimer, append_jsonl, stage
+from sensitivity import sensitivity_analysis
+from simulation import simulate_recommendations
 
 # Page Configuration
 st.set_page_config(
@@ -54,122 +61,359 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# AI Agents Database (25+ agents with 2025 performance metrics)
-AI_AGENTS = pd.DataFrame([
-    {"id": 1, "name": "CrowdStrike Falcon XDR", "effectiveness": 0.95, "speed": 8.5, "fp_rate": 0.02, "cost": 850, "coverage": "ransomware,malware,apt,lateral_movement"},
-    {"id": 2, "name": "Darktrace Enterprise Immune", "effectiveness": 0.92, "speed": 9.2, "fp_rate": 0.05, "cost": 920, "coverage": "insider_threat,lateral_movement,data_exfiltration,apt"},
-    {"id": 3, "name": "Microsoft Defender AI", "effectiveness": 0.89, "speed": 7.8, "fp_rate": 0.03, "cost": 680, "coverage": "phishing,malware,ransomware,credential_theft"},
-    {"id": 4, "name": "Vectra AI Cognito", "effectiveness": 0.94, "speed": 9.0, "fp_rate": 0.04, "cost": 890, "coverage": "lateral_movement,c2_communication,data_exfiltration"},
-    {"id": 5, "name": "SentinelOne Singularity", "effectiveness": 0.93, "speed": 8.8, "fp_rate": 0.03, "cost": 780, "coverage": "ransomware,zero_day,malware,apt"},
-    {"id": 6, "name": "Proofpoint Email Defense", "effectiveness": 0.91, "speed": 7.5, "fp_rate": 0.02, "cost": 450, "coverage": "phishing,business_email_compromise,malware"},
-    {"id": 7, "name": "Palo Alto Cortex XDR", "effectiveness": 0.90, "speed": 8.3, "fp_rate": 0.04, "cost": 820, "coverage": "ransomware,malware,apt,zero_day"},
-    {"id": 8, "name": "Splunk UEBA", "effectiveness": 0.87, "speed": 6.5, "fp_rate": 0.06, "cost": 720, "coverage": "insider_threat,credential_theft,privilege_escalation"},
-    {"id": 9, "name": "IBM QRadar SIEM", "effectiveness": 0.85, "speed": 6.8, "fp_rate": 0.05, "cost": 950, "coverage": "apt,compliance_violation,data_exfiltration"},
-    {"id": 10, "name": "Cloudflare Magic Firewall", "effectiveness": 0.88, "speed": 9.5, "fp_rate": 0.03, "cost": 580, "coverage": "ddos,web_attack,bot_attack"},
-    {"id": 11, "name": "Abnormal Security", "effectiveness": 0.93, "speed": 8.0, "fp_rate": 0.02, "cost": 520, "coverage": "business_email_compromise,phishing,account_takeover"},
-    {"id": 12, "name": "Cybereason Defense Platform", "effectiveness": 0.91, "speed": 8.6, "fp_rate": 0.04, "cost": 790, "coverage": "ransomware,malware,apt"},
-    {"id": 13, "name": "Cisco SecureX", "effectiveness": 0.86, "speed": 7.2, "fp_rate": 0.05, "cost": 840, "coverage": "malware,web_attack,c2_communication"},
-    {"id": 14, "name": "Fortinet FortiAI", "effectiveness": 0.89, "speed": 8.1, "fp_rate": 0.04, "cost": 710, "coverage": "ransomware,zero_day,malware"},
-    {"id": 15, "name": "Trellix XDR", "effectiveness": 0.88, "speed": 7.9, "fp_rate": 0.04, "cost": 760, "coverage": "apt,malware,data_exfiltration"},
-    {"id": 16, "name": "Exabeam UEBA", "effectiveness": 0.90, "speed": 7.0, "fp_rate": 0.05, "cost": 690, "coverage": "insider_threat,credential_theft,privilege_escalation"},
-    {"id": 17, "name": "Zscaler Zero Trust", "effectiveness": 0.87, "speed": 8.7, "fp_rate": 0.03, "cost": 620, "coverage": "data_exfiltration,lateral_movement,zero_day"},
-    {"id": 18, "name": "TrendMicro Vision One", "effectiveness": 0.89, "speed": 8.2, "fp_rate": 0.04, "cost": 730, "coverage": "ransomware,malware,phishing"},
-    {"id": 19, "name": "Rapid7 InsightIDR", "effectiveness": 0.86, "speed": 7.4, "fp_rate": 0.05, "cost": 650, "coverage": "insider_threat,lateral_movement,credential_theft"},
-    {"id": 20, "name": "Sophos Intercept X", "effectiveness": 0.88, "speed": 8.0, "fp_rate": 0.03, "cost": 590, "coverage": "ransomware,malware,zero_day"},
-    {"id": 21, "name": "Carbon Black Cloud", "effectiveness": 0.91, "speed": 8.4, "fp_rate": 0.03, "cost": 770, "coverage": "apt,ransomware,malware"},
-    {"id": 22, "name": "Securonix UEBA", "effectiveness": 0.89, "speed": 6.9, "fp_rate": 0.06, "cost": 710, "coverage": "insider_threat,privilege_escalation,data_exfiltration"},
-    {"id": 23, "name": "Symantec Endpoint Security", "effectiveness": 0.87, "speed": 7.7, "fp_rate": 0.04, "cost": 640, "coverage": "malware,ransomware,phishing"},
-    {"id": 24, "name": "Chronicle Security", "effectiveness": 0.90, "speed": 7.6, "fp_rate": 0.04, "cost": 880, "coverage": "apt,c2_communication,data_exfiltration"},
-    {"id": 25, "name": "Arctic Wolf MDR", "effectiveness": 0.92, "speed": 8.3, "fp_rate": 0.03, "cost": 810, "coverage": "ransomware,apt,lateral_movement"}
-])
+@st.cache_resource(show_spinner=False)
+def catalog_store(path):
+    """One memory-mapped, hot-reloading catalog shared by every session"""
+    return CatalogStore(path)
 
-# Threat Types Database
-THREAT_TYPES = {
-    "ransomware": {"name": "Ransomware Attack", "severity": "CRITICAL", "description": "File encryption with ransom demand"},
-    "phishing": {"name": "Phishing Campaign", "severity": "HIGH", "description": "Credential harvesting via email"},
-    "apt": {"name": "Advanced Persistent Threat", "severity": "CRITICAL", "description": "Long-term targeted intrusion"},
-    "ddos": {"name": "DDoS Attack", "severity": "HIGH", "description": "Distributed denial of service"},
-    "insider_threat": {"name": "Insider Threat", "severity": "HIGH", "description": "Malicious internal actor"},
-    "lateral_movement": {"name": "Lateral Movement", "severity": "CRITICAL", "description": "Network propagation detected"},
-    "data_exfiltration": {"name": "Data Exfiltration", "severity": "CRITICAL", "description": "Unauthorized data transfer"},
-    "malware": {"name": "Malware Infection", "severity": "HIGH", "description": "Malicious software detected"},
-    "zero_day": {"name": "Zero-Day Exploit", "severity": "CRITICAL", "description": "Unknown vulnerability exploitation"},
-    "credential_theft": {"name": "Credential Theft", "severity": "HIGH", "description": "Account credentials compromised"},
-    "business_email_compromise": {"name": "Business Email Compromise", "severity": "CRITICAL", "description": "Executive email account takeover"},
-    "privilege_escalation": {"name": "Privilege Escalation", "severity": "HIGH", "description": "Unauthorized privilege elevation"},
-    "c2_communication": {"name": "C2 Communication", "severity": "CRITICAL", "description": "Command and control traffic"},
-    "web_attack": {"name": "Web Application Attack", "severity": "MEDIUM", "description": "SQL injection or XSS detected"},
-    "bot_attack": {"name": "Bot Attack", "severity": "MEDIUM", "description": "Automated malicious traffic"}
-}
+@st.cache_resource(show_spinner=False)
+def history_writer(path):
+    """Recommendation history shared by every session, flushed in batches"""
+    from history import HistoryWriter
+    return HistoryWriter(path)
 
-# CyberAI-Orchestrator Scoring Algorithm (2025 Paper Implementation)
-def calculate_agent_score(agent, threat_type):
-    """
-    Implements the scoring formula from the 2025 research paper:
-    Score = Effectiveness × Speed × (1/FP-rate) × Coverage - Cost_factor
-    """
-    coverage_list = agent['coverage'].split(',')
-    coverage_bonus = 1.0 if threat_type in coverage_list else 0.3
-    fp_penalty = 1 / (agent['fp_rate'] + 0.01)
-    cost_normalized = 1000 / agent['cost']
+def current_catalog():
+    """External catalog from CYBERAI_CATALOG (directory, Parquet or Arrow) or the built-in agents"""
+    path = os.environ.get('CYBERAI_CATALOG')
+    return catalog_store(path).get() if path else AI_AGENTS
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_recommendations(threat_type, top_n, seed, catalog_version, profile=DEFAULT_PROFILE, _agents=None,
+                           _timer=None):
+    """Seeded recommendations memoized by Streamlit; catalog_version keys out stale catalogs"""
+    return rank_agents(_agents, threat_type, top_n=top_n, seed=seed, timer=_timer, weights=profile)
+
+# Session State
+ANALYSIS_HISTORY = 16
+
+def stored_analyses():
+    """Analyses of this session keyed by (threat_type, seed, trials, profile); seed is None for unseeded runs"""
+    return st.session_state.setdefault('analyses', {})
+
+def remember_analysis(key, analysis):
+    """Stores an analysis, keeping the ANALYSIS_HISTORY most recent"""
+    analyses = stored_analyses()
+    analyses.pop(key, None)
+    analyses[key] = analysis
+    while len(analyses) > ANALYSIS_HISTORY:
+        analyses.pop(next(iter(analyses)))
+
+def pick_random_threat():
+    st.session_state.threat_type = np.random.choice(list(THREAT_TYPES.keys()))
+
+def plot_chart(build, charts, measure=False):
+    """Draws the figure returned by build(), adding its build time and, when measuring, its payload to charts"""
+    start = time.perf_counter()
+    fig = build()
+    charts['build_s'] += time.perf_counter() - start
+    charts['figures'] += 1
+    if measure:
+        size, seconds = figure_payload(fig)
+        charts['payload_bytes'] += size
+        charts['serialize_s'] += seconds
+    st.plotly_chart(fig, use_container_width=True)
+
+# Results View
+@st.fragment
+def render_results(threat_type, threat_info, analysis, measure=False):
+    """Summary metrics, top-5 agent cards with radar charts and the simulated time-savings comparison"""
+    recommendations, simulation = analysis['recommendations'], analysis['simulation']
+    version = analysis['catalog_version']
+    charts = {'figures': 0, 'payload_bytes': 0, 'build_s': 0.0, 'serialize_s': 0.0}
     
-    # Weighted scoring formula
-    score = (
-        agent['effectiveness'] * 10 +
-        agent['speed'] * 1.2 +
-        fp_penalty * 0.8 +
-        coverage_bonus * 15 -
-        (agent['cost'] / 100)
-    )
+    # Summary Metrics
+    st.markdown("### 📊 Summary Metrics")
     
-    expected_time = int((10 - agent['speed']) * 2 + np.random.randint(3, 8))
-    confidence = min(99, int(score * 3.5 + 40))
+    col1, col2, col3, col4 = st.columns(4)
     
-    return {
-        'agent': agent['name'],
-        'score': max(0, score),
-        'effectiveness': agent['effectiveness'],
-        'speed': agent['speed'],
-        'fp_rate': agent['fp_rate'],
-        'cost': agent['cost'],
-        'coverage': coverage_list,
-        'expected_time': expected_time,
-        'confidence': confidence
-    }
-
-def generate_pdf_playbook(threat_type, recommendations):
-    """Generate incident response playbook PDF"""
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", 'B', 16)
+    with col1:
+        st.markdown(f"""
+        <div class='metric-card'>
+            <h4>🎯 Top Agent</h4>
+            <h2>{recommendations[0]['agent'].split()[0]}</h2>
+            <p>{recommendations[0]['confidence']}% confidence</p>
+        </div>
+        """, unsafe_allow_html=True)
     
-    pdf.cell(0, 10, 'CyberAI Orchestrator - Incident Response Playbook', 0, 1, 'C')
-    pdf.set_font("Arial", '', 10)
-    pdf.cell(0, 10, f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', 0, 1, 'C')
+    with col2:
+        orchestrated = simulation['orchestrated']
+        st.markdown(f"""
+        <div class='metric-card'>
+            <h4>⏱️ Median Response</h4>
+            <h2>{orchestrated['p50']:.0f} min</h2>
+            <p>p90 {orchestrated['p90']:.0f} min · p99 {orchestrated['p99']:.0f} min</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div class='metric-card'>
+            <h4>📈 Effectiveness</h4>
+            <h2>{int(recommendations[0]['effectiveness']*100)}%</h2>
+            <p>Success rate</p>
+        </div>
+        """, unsafe_allow_html=True)
     
-    pdf.ln(10)
-    pdf.set_font("Arial", 'B', 14)
-    threat_info = THREAT_TYPES[threat_type]
-    pdf.cell(0, 10, f'Threat: {threat_info["name"]} ({threat_info["severity"]})', 0, 1)
+    with col4:
+        total_cost = sum([r['cost'] for r in recommendations])
+        st.markdown(f"""
+        <div class='metric-card'>
+            <h4>💰 Total Cost</h4>
+            <h2>${total_cost}</h2>
+            <p>Monthly licensing</p>
+        </div>
+        """, unsafe_allow_html=True)
     
-    pdf.set_font("Arial", '', 11)
-    pdf.multi_cell(0, 10, f'Description: {threat_info["description"]}')
+    st.markdown("---")
     
-    pdf.ln(5)
-    pdf.set_font("Arial", 'B', 12)
-    pdf.cell(0, 10, 'Recommended AI Agents (Top 5):', 0, 1)
+    # Recommended Agents
+    st.markdown("### 🏆 Recommended AI Agents (Top 5)")
     
-    for idx, rec in enumerate(recommendations[:5], 1):
-        pdf.set_font("Arial", 'B', 11)
-        pdf.cell(0, 10, f'{idx}. {rec["agent"]} (Score: {rec["score"]:.1f})', 0, 1)
-        pdf.set_font("Arial", '', 10)
-        pdf.cell(0, 6, f'   Confidence: {rec["confidence"]}% | Expected Time: {rec["expected_time"]} min', 0, 1)
-        pdf.cell(0, 6, f'   Effectiveness: {rec["effectiveness"]*100:.0f}% | Speed: {rec["speed"]:.1f}/10 | FP Rate: {rec["fp_rate"]*100:.1f}%', 0, 1)
-        pdf.ln(3)
+    # One multi-trace radar instead of a figure per agent card
+    combined = st.toggle("📡 Compare agents in one radar chart", key="radar_combined")
+    if combined:
+        plot_chart(lambda: radar_comparison_figure(recommendations, version), charts, measure)
     
-    pdf_output = f"playbook_{threat_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    pdf.output(pdf_output)
-    return pdf_output
+    for idx, rec in enumerate(recommendations):
+        with st.expander(f"**#{idx+1}** - {rec['agent']} (Score: {rec['score']:.1f}, Confidence: {rec['confidence']}%)", expanded=(idx==0)):
+            col1, col2 = (st.container(), None) if combined else st.columns([2, 1])
+            
+            with col1:
+                st.markdown(f"""
+                **Performance Metrics:**
+                - ✅ Effectiveness: {rec['effectiveness']*100:.0f}%
+                - ⚡ Speed: {rec['speed']:.1f}/10
+                - 🎯 False Positive Rate: {rec['fp_rate']*100:.1f}%
+                - ⏱️ Expected Containment Time: **{rec['expected_time']} minutes**
+                - 📊 Simulated Containment: p50 {rec['containment']['p50']:.1f} / p90 {rec['containment']['p90']:.1f} / p99 {rec['containment']['p99']:.1f} min
+                - 💵 Monthly Cost: ${rec['cost']}
+                """)
+                
+                if idx == 0:
+                    st.info(f"""
+                    **💡 Why this agent?**
+                    
+                    Highest combined score for {threat_info['name']}. Optimal balance of effectiveness 
+                    ({rec['effectiveness']*100:.0f}%), response speed ({rec['speed']:.1f}/10), 
+                    and low false-positive rate ({rec['fp_rate']*100:.1f}%).
+                    {'✓ Direct coverage for this threat type.' if threat_type in rec['coverage'] else ''}
+                    """)
+            
+            if col2 is not None:
+                with col2:
+                    # Radar chart for individual agent
+                    plot_chart(lambda: radar_figure(rec, version), charts, measure)
+    
+    st.markdown("---")
+    
+    # Time Savings Comparison
+    st.markdown("### ⏱️ Response Time Comparison")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        manual = simulation['manual']
+        st.markdown(f"""
+        <div style='background: rgba(239, 68, 68, 0.1); padding: 20px; border-radius: 10px; border: 1px solid rgba(239, 68, 68, 0.3);'>
+            <h4 style='color: #f87171;'>❌ Manual SOC Decision</h4>
+            <h1 style='color: #f87171; font-size: 48px;'>{manual['p50']:.0f} min</h1>
+            <p style='color: #cbd5e1;'>Median agent selection + response (p90 {manual['p90']:.0f} min)</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div style='background: rgba(34, 197, 94, 0.1); padding: 20px; border-radius: 10px; border: 1px solid rgba(34, 197, 94, 0.3);'>
+            <h4 style='color: #4ade80;'>✅ CyberAI-Orchestrator</h4>
+            <h1 style='color: #4ade80; font-size: 48px;'>{orchestrated['p50']:.0f} min</h1>
+            <p style='color: #cbd5e1;'>Instant agent selection + automated response (p90 {orchestrated['p90']:.0f} min)</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    saved = simulation['time_saved']
+    st.success(f"⚡ **Time Saved: ~{saved['p50']:.0f} minutes per incident** (median; Reduction: "
+               f"{(saved['p50']/manual['p50'])*100:.1f}%) · mean {saved['mean']:.1f} min, "
+               f"95% CI {saved['mean_ci'][0]:.1f}-{saved['mean_ci'][1]:.1f}")
+    
+    # Comparison Chart, built once per analysis
+    if 'time_figure' not in analysis:
+        analysis['time_figure'] = time_comparison_figure(simulation)
+    plot_chart(lambda: analysis['time_figure'], charts, measure)
+    analysis['charts'] = charts
+
+@st.fragment
+def render_playbook_download(threat_type, analysis, show_diagnostics=False):
+    """
+    PDF playbook generation and download. Runs as a fragment, so its buttons
+    rerun only this block; the PDF is kept with the stored analysis.
+    """
+    # PDF Generation
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        if st.button("📥 Download PDF Incident Response Playbook", use_container_width=True):
+            timer = StageTimer(threat_type=threat_type, action='playbook')
+            with st.spinner("Generating PDF..."):
+                with timer.stage('pdf'):
+                    analysis['playbook'] = generate_pdf_playbook(threat_type, analysis['recommendations'],
+                                                                   analysis['simulation'])
+            record_metrics(timer)
+            # The diagnostics panel shows the analysis timer; keep the latest PDF stage there too
+            analysis['timer'].stages['pdf'] = timer.stages['pdf']
+            if show_diagnostics:
+                # The panel lives outside this fragment, so refresh the whole page to show it
+                st.rerun()
+            st.success("✅ PDF generated successfully!")
+        if 'playbook' in analysis:
+            st.download_button(
+                label="💾 Download PDF",
+                data=analysis['playbook'],
+                file_name=playbook_filename(threat_type),
+                mime="application/pdf",
+                on_click="ignore",
+                use_container_width=True
+            )
+
+# Multi-Threat Portfolio
+# Agents per threat the optimizer considers; keeps many-threat searches on large catalogs to seconds
+PORTFOLIO_CANDIDATES = 50
+
+@st.fragment
+def render_portfolio_optimizer(threat_type):
+    """Budget-constrained agent portfolio covering several concurrent threats"""
+    with st.expander("🧩 Multi-Threat Portfolio Optimizer", expanded=False):
+        with st.form("portfolio_form"):
+            threats = st.multiselect(
+                "Concurrent threats:",
+                options=list(THREAT_TYPES.keys()),
+                default=[threat_type],
+                format_func=lambda x: THREAT_TYPES[x]['name']
+            )
+            budget = st.number_input("Monthly budget ($)", min_value=0, value=2500, step=100)
+            optimize = st.form_submit_button("🧮 Optimize Portfolio", use_container_width=True)
+        
+        if optimize and threats:
+            portfolio = optimize_portfolio(threats, budget, current_catalog(), max_candidates=PORTFOLIO_CANDIDATES)
+            if not portfolio['feasible']:
+                if portfolio['uncovered']:
+                    st.error(f"No agent covers: {', '.join(THREAT_TYPES[t]['name'] for t in portfolio['uncovered'])}")
+                else:
+                    st.warning(f"No portfolio covers all selected threats within ${budget:,}/month.")
+                return
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Agents", len(portfolio['agents']))
+            col2.metric("Total Cost", f"${portfolio['total_cost']:,.0f}")
+            col3.metric("Combined Score", f"{portfolio['utility']:.1f}")
+            st.table([
+                {
+                    'Agent': entry['agent'],
+                    'Monthly Cost': f"${entry['cost']:,.0f}",
+                    'Handles': ', '.join(THREAT_TYPES[t]['name'] for t in entry['threats'])
+                }
+                for entry in portfolio['agents']
+            ])
+            if not portfolio['exact']:
+                st.caption(f"Searched each threat's {PORTFOLIO_CANDIDATES} best-scoring and most cost-efficient "
+                           f"agents only; the catalog has more covering agents.")
+
+@st.fragment
+def render_pareto_frontier(threat_type):
+    """Non-dominated agents for the threat across effectiveness, speed, FP rate and cost"""
+    with st.expander("📐 Trade-off Frontier (Pareto-Optimal Agents)", expanded=False):
+        agents = current_catalog()
+        # The slider spans the catalog's costs; its top position means no cost limit
+        cost_ceiling = max(50, int(np.ceil(float(np.max(agents['cost'])) / 50)) * 50)
+        col1, col2 = st.columns(2)
+        with col1:
+            max_cost = st.slider("Max monthly cost ($)", min_value=0, max_value=cost_ceiling, value=cost_ceiling,
+                                 step=50, key="pareto_max_cost", help="Rightmost position: no limit")
+        with col2:
+            min_effectiveness = st.slider("Min effectiveness (%)", min_value=0, max_value=100, value=0,
+                                          key="pareto_min_effectiveness")
+        
+        frontier = pareto_frontier(agents, threat_type, max_cost=None if max_cost >= cost_ceiling else max_cost,
+                                   min_effectiveness=min_effectiveness / 100)
+        if not frontier:
+            st.warning("No agent covering this threat meets these constraints.")
+            return
+        
+        st.plotly_chart(frontier_figure(frontier), use_container_width=True)
+        st.caption("Marker size is speed; no other covering agent is at least as good on every axis.")
+        st.table([
+            {
+                'Agent': entry['agent'],
+                'Effectiveness': f"{entry['effectiveness']*100:.0f}%",
+                'Speed': f"{entry['speed']:.1f}/10",
+                'FP Rate': f"{entry['fp_rate']*100:.1f}%",
+                'Monthly Cost': f"${entry['cost']:,.0f}",
+                'Score': f"{entry['score']:.1f}"
+            }
+            for entry in frontier
+        ])
+
+# Weight Sensitivity
+@st.fragment
+def render_weight_sensitivity(threat_type, profile):
+    """How stable the ranking stays when the scoring profile's weights are perturbed"""
+    with st.expander("🎚️ Ranking Sensitivity to Scoring Weights", expanded=False):
+        with st.form("sensitivity_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                samples = st.select_slider("Weight vectors", options=[100, 1000, 10000], value=1000)
+            with col2:
+                spread = st.slider("Weight spread (±%)", min_value=5, max_value=90, value=50, step=5)
+            run = st.form_submit_button("🎲 Run Sensitivity Sweep", use_container_width=True)
+        
+        if run:
+            report = sensitivity_analysis(current_catalog(), threat_type, profile, samples=samples,
+                                          spread=spread / 100, seed=0)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Top Agent Kept First", f"{report['top1_stability']:.0%}")
+            col2.metric("Mean Kendall Tau", f"{report['kendall_tau']['mean']:.2f}")
+            col3.metric("Worst 5% Kendall Tau", f"{report['kendall_tau']['p5']:.2f}")
+            st.table([
+                {
+                    'Rank': entry['baseline_rank'],
+                    'Agent': entry['agent'],
+                    'Top-1': f"{entry['top1_frequency']:.0%}",
+                    f"Top-{report['top_n']}": f"{entry['top_n_frequency']:.0%}",
+                    'Mean Rank': (f"{entry['mean_rank']:.1f} ± {entry['rank_std']:.1f}"
+                                   if entry['mean_rank'] is not None else '-'),
+                    'Kendall Tau': f"{entry['kendall_tau']:.2f}" if entry['kendall_tau'] is not None else '-'
+                }
+                for entry in report['agents'][:10]
+            ])
+            st.caption(f"{report['samples']:,} weight vectors, each weight of the "
+                       f"{profile.replace('_', ' ')} profile scaled by up to ±{spread}%.")
+
+# Diagnostics
+def record_metrics(timer):
+    """Feeds one analysis into the process metrics and the optional export files"""
+    METRICS.observe(timer)
+    if os.environ.get('CYBERAI_METRICS_JSONL'):
+        append_jsonl(os.environ['CYBERAI_METRICS_JSONL'], timer)
+    if os.environ.get('CYBERAI_METRICS_PROM'):
+        METRICS.write_prometheus(os.environ['CYBERAI_METRICS_PROM'])
+
+def render_diagnostics(timer, charts=None):
+    """Per-stage timings of the current analysis and results-view chart costs, with JSON / Prometheus export"""
+    with st.expander("🩺 Diagnostics - Pipeline Stage Timings", expanded=True):
+        st.table([
+            {'Stage': name, 'Time (ms)': round(seconds * 1000, 3)} for name, seconds in timer.stages.items()
+        ])
+        st.caption(f"Total: {timer.total * 1000:.2f} ms")
+        if charts:
+            st.caption(f"Charts: {charts['figures']} figures, {charts['payload_bytes'] / 1024:.1f} KB serialized · "
+                       f"build {charts['build_s'] * 1000:.2f} ms · serialize {charts['serialize_s'] * 1000:.2f} ms")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("⬇️ Metrics (JSON lines)", data=timer.to_json_line() + '\n',
+                               file_name="cyberai_metrics.jsonl", mime="application/json",
+                               use_container_width=True)
+        with col2:
+            st.download_button("⬇️ Metrics (Prometheus)", data=METRICS.to_prometheus(),
+                               file_name="cyberai_metrics.prom", mime="text/plain",
+                               use_container_width=True)
 
 # Main Application
 def main():
@@ -198,21 +442,29 @@ def main():
         threat_type = st.selectbox(
             "Choose threat type:",
             options=list(THREAT_TYPES.keys()),
-            format_func=lambda x: f"{THREAT_TYPES[x]['name']} ({THREAT_TYPES[x]['severity']})"
+            format_func=lambda x: f"{THREAT_TYPES[x]['name']} ({THREAT_TYPES[x]['severity']})",
+            key="threat_type"
         )
         
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("🎲 Random Attack", use_container_width=True):
-                threat_type = np.random.choice(list(THREAT_TYPES.keys()))
-                st.rerun()
+            st.button("🎲 Random Attack", use_container_width=True, on_click=pick_random_threat)
         
         with col2:
             analyze_button = st.button("▶️ Analyze Alert", type="primary", use_container_width=True)
         
+        deterministic = st.checkbox("🔒 Reproducible results (seeded)", value=True)
+        seed = st.number_input("Seed", min_value=0, value=2025, step=1, disabled=not deterministic)
+        trials = st.select_slider("Simulated incidents per agent", options=[1000, 10000, 100000, 1000000],
+                                  value=10000)
+        profile = st.selectbox("Scoring profile", options=list(WEIGHT_PROFILES),
+                               index=list(WEIGHT_PROFILES).index(DEFAULT_PROFILE),
+                               format_func=lambda x: x.replace('_', ' ').title())
+        show_diagnostics = st.checkbox("🩺 Show diagnostics", value=False)
+        
         st.markdown("---")
         st.markdown("#### 📊 System Info")
-        st.info(f"**Total AI Agents:** {len(AI_AGENTS)}\n\n**Threat Types:** {len(THREAT_TYPES)}")
+        st.info(f"**Total AI Agents:** {len(current_catalog()):,}\n\n**Threat Types:** {len(THREAT_TYPES)}")
         
         st.markdown("---")
         st.markdown("#### 👥 Team Members")
@@ -245,215 +497,72 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     
+        render_portfolio_optimizer(threat_type)
+        render_pareto_frontier(threat_type)
+        render_weight_sensitivity(threat_type, profile)
+    
+    # Results persist in session state, so widget reruns show them again without re-analysis
+    analysis_key = (threat_type, int(seed) if deterministic else None, trials, profile)
+    timer = None
     if analyze_button and threat_type:
-        # Analysis Progress
-        with st.spinner(""):
-            st.markdown("### 🔄 Running CyberAI-Orchestrator Decision Engine...")
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            steps = [
-                "Loading threat intelligence feeds...",
-                "Calculating agent effectiveness scores...",
-                "Analyzing false-positive rates...",
-                "Optimizing response time vs cost...",
-                "Ranking agents..."
-            ]
+        timer = StageTimer(threat_type=threat_type, seeded=bool(deterministic))
+        with st.spinner("Running CyberAI-Orchestrator Decision Engine..."):
+            with timer.stage('catalog_load'):
+                agents = current_catalog()
+                catalog_version = RECOMMENDATION_CACHE.version(agents)
+                precompute_frontiers(agents)
+                precompute_radar_traces(agents)
             
-            for i, step in enumerate(steps):
-                status_text.text(f"✓ {step}")
-                progress_bar.progress((i + 1) / len(steps))
-                time.sleep(0.3)
+            # Score all agents in one vectorized pass and keep the top 5
+            if deterministic:
+                lookup_start = time.perf_counter()
+                recommendations = cached_recommendations(
+                    threat_type, 5, int(seed), catalog_version, profile, _agents=agents, _timer=timer
+                )
+                # A cache hit skips the scoring stages entirely
+                if 'scoring' not in timer.stages:
+                    timer.add('cache_lookup', time.perf_counter() - lookup_start)
+            else:
+                recommendations = rank_agents(agents, threat_type, top_n=5, timer=timer, weights=profile)
             
-            # Calculate scores for all agents
-            recommendations = []
-            for _, agent in AI_AGENTS.iterrows():
-                score_data = calculate_agent_score(agent, threat_type)
-                recommendations.append(score_data)
-            
-            # Sort by score and get top 5
-            recommendations = sorted(recommendations, key=lambda x: x['score'], reverse=True)[:5]
-            
-            status_text.text("✓ Analysis complete!")
-            time.sleep(0.5)
-            progress_bar.empty()
-            status_text.empty()
-        
-        st.success("✅ **Analysis Complete!**")
-        st.markdown("---")
-        
-        # Summary Metrics
-        st.markdown("### 📊 Summary Metrics")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown(f"""
-            <div class='metric-card'>
-                <h4>🎯 Top Agent</h4>
-                <h2>{recommendations[0]['agent'].split()[0]}</h2>
-                <p>{recommendations[0]['confidence']}% confidence</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            avg_time = int(np.mean([r['expected_time'] for r in recommendations]))
-            st.markdown(f"""
-            <div class='metric-card'>
-                <h4>⏱️ Avg Response</h4>
-                <h2>{avg_time} min</h2>
-                <p>Expected containment</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
-            <div class='metric-card'>
-                <h4>📈 Effectiveness</h4>
-                <h2>{int(recommendations[0]['effectiveness']*100)}%</h2>
-                <p>Success rate</p>
-            </div>
-            """, unsafe_allow_html=True)
+            # Containment-time distributions for the time-savings view and the playbook
+            with timer.stage('simulation'):
+                recommendations, simulation = simulate_recommendations(
+                    agents, threat_type, recommendations, trials, seed=int(seed) if deterministic else None
+                )
         
-        with col4:
-            total_cost = sum([r['cost'] for r in recommendations])
-            st.markdown(f"""
-            <div class='metric-card'>
-                <h4>💰 Total Cost</h4>
-                <h2>${total_cost}</h2>
-                <p>Monthly licensing</p>
-            </div>
-            """, unsafe_allow_html=True)
+        if os.environ.get('CYBERAI_HISTORY'):
+            with timer.stage('history'):
+                history_writer(os.environ['CYBERAI_HISTORY']).record(
+                    threat_type, recommendations, source='app', top_n=5, seed=int(seed) if deterministic else None,
+                    profile=profile, catalog_version=catalog_version
+                )
         
+        remember_analysis(analysis_key, {
+            'recommendations': recommendations,
+            'simulation': simulation,
+            'catalog_version': catalog_version,
+            'timer': timer
+        })
+    
+    analysis = stored_analyses().get(analysis_key) if threat_type else None
+    if analysis:
+        st.success("✅ **Analysis Complete!**")
+        if analysis['catalog_version'] != RECOMMENDATION_CACHE.version(current_catalog()):
+            st.warning("The agent catalog changed since this analysis. Click **Analyze Alert** to refresh it.")
         st.markdown("---")
         
-        # Recommended Agents
-        st.markdown("### 🏆 Recommended AI Agents (Top 5)")
-        
-        for idx, rec in enumerate(recommendations):
-            with st.expander(f"**#{idx+1}** - {rec['agent']} (Score: {rec['score']:.1f}, Confidence: {rec['confidence']}%)", expanded=(idx==0)):
-                col1, col2 = st.columns([2, 1])
-                
-                with col1:
-                    st.markdown(f"""
-                    **Performance Metrics:**
-                    - ✅ Effectiveness: {rec['effectiveness']*100:.0f}%
-                    - ⚡ Speed: {rec['speed']:.1f}/10
-                    - 🎯 False Positive Rate: {rec['fp_rate']*100:.1f}%
-                    - ⏱️ Expected Containment Time: **{rec['expected_time']} minutes**
-                    - 💵 Monthly Cost: ${rec['cost']}
-                    """)
-                    
-                    if idx == 0:
-                        st.info(f"""
-                        **💡 Why this agent?**
-                        
-                        Highest combined score for {threat_info['name']}. Optimal balance of effectiveness 
-                        ({rec['effectiveness']*100:.0f}%), response speed ({rec['speed']:.1f}/10), 
-                        and low false-positive rate ({rec['fp_rate']*100:.1f}%).
-                        {'✓ Direct coverage for this threat type.' if threat_type in rec['coverage'] else ''}
-                        """)
-                
-                with col2:
-                    # Radar chart for individual agent
-                    categories = ['Effectiveness', 'Speed', 'Low FP Rate', 'Cost Efficiency']
-                    values = [
-                        rec['effectiveness'] * 100,
-                        rec['speed'] * 10,
-                        (1 - rec['fp_rate']) * 100,
-                        (1000 - rec['cost']) / 10
-                    ]
-                    
-                    fig = go.Figure()
-                    fig.add_trace(go.Scatterpolar(
-                        r=values,
-                        theta=categories,
-                        fill='toself',
-                        name=rec['agent'],
-                        line_color='cyan'
-                    ))
-                    
-                    fig.update_layout(
-                        polar=dict(
-                            radialaxis=dict(visible=True, range=[0, 100])
-                        ),
-                        showlegend=False,
-                        height=250,
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        font=dict(color='white', size=10)
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+        with stage(timer, 'rendering'):
+            render_results(threat_type, threat_info, analysis, measure=show_diagnostics)
         
         st.markdown("---")
         
-        # Time Savings Comparison
-        st.markdown("### ⏱️ Response Time Comparison")
+        render_playbook_download(threat_type, analysis, show_diagnostics)
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            manual_time = avg_time + 8
-            st.markdown(f"""
-            <div style='background: rgba(239, 68, 68, 0.1); padding: 20px; border-radius: 10px; border: 1px solid rgba(239, 68, 68, 0.3);'>
-                <h4 style='color: #f87171;'>❌ Manual SOC Decision</h4>
-                <h1 style='color: #f87171; font-size: 48px;'>{manual_time} min</h1>
-                <p style='color: #cbd5e1;'>Average time wasted on agent selection + response</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
-            <div style='background: rgba(34, 197, 94, 0.1); padding: 20px; border-radius: 10px; border: 1px solid rgba(34, 197, 94, 0.3);'>
-                <h4 style='color: #4ade80;'>✅ CyberAI-Orchestrator</h4>
-                <h1 style='color: #4ade80; font-size: 48px;'>{avg_time} min</h1>
-                <p style='color: #cbd5e1;'>Instant agent selection + automated response</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        time_saved = manual_time - avg_time
-        st.success(f"⚡ **Time Saved: ~{time_saved} minutes per incident** (Reduction: {(time_saved/manual_time)*100:.1f}%)")
-        
-        # Comparison Chart
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=['Manual SOC', 'CyberAI-Orchestrator'],
-            y=[manual_time, avg_time],
-            marker_color=['#ef4444', '#22c55e'],
-            text=[f'{manual_time} min', f'{avg_time} min'],
-            textposition='auto',
-        ))
-        
-        fig.update_layout(
-            title='Response Time Comparison',
-            yaxis_title='Time (minutes)',
-            showlegend=False,
-            height=300,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white')
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
-        st.markdown("---")
-        
-        # PDF Generation
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2:
-            if st.button("📥 Download PDF Incident Response Playbook", use_container_width=True):
-                with st.spinner("Generating PDF..."):
-                    pdf_file = generate_pdf_playbook(threat_type, recommendations)
-                    with open(pdf_file, "rb") as f:
-                        st.download_button(
-                            label="💾 Download PDF",
-                            data=f,
-                            file_name=pdf_file,
-                            mime="application/pdf",
-                            use_container_width=True
-                        )
-                    st.success("✅ PDF generated successfully!")
+        if timer is not None:
+            record_metrics(timer)
+        if show_diagnostics:
+            render_diagnostics(analysis['timer'], analysis.get('charts'))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+CyberAI Orchestrator - Ranking Sensitivity Analysis
+How much do the recommendations depend on the scoring weights? Samples many
+weight vectors around a profile (a random sample or a full grid of per-weight
+multipliers), scores the whole catalog under all of them as one
+(weight vectors × agents) matrix product per chunk, and reports rank
+stability per agent: how often it ranks first or in the top-n, its rank
+spread, and its share of the Kendall tau between each sampled ranking and the
+profile's own ranking.
+
+Rank statistics and Kendall tau cover the profile's top `candidates` agents
+(ranked among themselves); top-1 and top-n frequencies cover the full catalog,
+so outsiders that win under some weights are reported too. Large sweeps are
+spread over a process pool; results do not depend on the worker count.
+
+Usage:
+    python sensitivity.py --threat ransomware --samples 10000 --spread 0.5
+    python sensitivity.py --profile budget --method grid --levels 5 --workers 4 --output sensitivity.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from engine import (AI_AGENTS, THREAT_BITS, THREAT_TYPES, WEIGHT_FIELDS, WEIGHT_PROFILES, _raw_score_matrix,
+                    resolve_weights, score_features, top_k_indices)
+
+# Weight columns applied to the per-agent linear terms, in _linear_terms order
+LINEAR_WEIGHTS = [WEIGHT_FIELDS.index(name) for name in ('effectiveness', 'speed', 'fp_penalty', 'cost')]
+COVERAGE = WEIGHT_FIELDS.index('coverage')
+INDIRECT = WEIGHT_FIELDS.index('indirect_coverage')
+SCORE_CELLS = 1 << 22        # weight vectors × agents scored at once
+PARALLEL_MIN_CELLS = 1 << 24  # smaller sweeps run in-process
+
+_STATE = None
+
+
+def sample_weights(weights=None, samples=1000, spread=0.5, method='random', levels=3, seed=None):
+    """
+    (vectors × len(WEIGHT_FIELDS)) weight matrix around a profile: every weight
+    multiplied by a factor in [1 - spread, 1 + spread], drawn uniformly
+    ('random', samples rows) or on an evenly spaced grid ('grid',
+    levels ** len(WEIGHT_FIELDS) rows). indirect_coverage is capped at 1.
+    """
+    if not 0 <= spread < 1:
+        raise ValueError("spread must be in [0, 1)")
+    base = resolve_weights(weights)
+    vector = np.array([base[name] for name in WEIGHT_FIELDS], dtype=np.float64)
+
+    if method == 'grid':
+        if levels < 1:
+            raise ValueError("levels must be at least 1")
+        steps = np.linspace(1 - spread, 1 + spread, levels) if levels > 1 else np.ones(1)
+        grids = np.meshgrid(*[steps] * len(WEIGHT_FIELDS), indexing='ij')
+        factors = np.stack([grid.ravel() for grid in grids], axis=1)
+    elif method == 'random':
+        if samples < 1:
+            raise ValueError("samples must be at least 1")
+        factors = np.random.default_rng(seed).uniform(1 - spread, 1 + spread, (samples, len(WEIGHT_FIELDS)))
+    else:
+        raise ValueError(f"Unknown sampling method {method!r}, expected 'random' or 'grid'")
+
+    matrix = vector * factors
+    matrix[:, INDIRECT] = np.minimum(matrix[:, INDIRECT], 1.0)
+    return matrix
+
+
+def _linear_terms(features):
+    """(agents × 4) terms multiplied by the LINEAR_WEIGHTS columns"""
+    fp_penalty = 1 / (features['fp_rate'] + 0.01)
+    return np.stack([features['effectiveness'], features['speed'], fp_penalty, -(features['cost'] / 100)], axis=1)
+
+
+def score_tensor(terms, covered, weight_matrix):
+    """
+    Clipped scores of every agent under every weight vector, shape
+    (vectors × agents). Broadcast products summed in the engine formula's
+    order (coverage term before cost) rather than one matrix product, whose
+    rounding varies with the array shapes: scores equal _raw_score_matrix
+    for each vector, so ties and ranks match the engine's.
+    """
+    linear = weight_matrix[:, LINEAR_WEIGHTS]
+    scores = np.multiply(linear[:, 0, None], terms[None, :, 0])
+    product = np.empty_like(scores)
+    for j in (1, 2):
+        scores += np.multiply(linear[:, j, None], terms[None, :, j], out=product)
+    bonus = np.where(covered[None, :], 1.0, weight_matrix[:, INDIRECT, None])
+    scores += np.multiply(bonus, weight_matrix[:, COVERAGE, None], out=product)
+    scores += np.multiply(linear[:, 3, None], terms[None, :, 3], out=product)
+    return np.maximum(0, scores, out=scores)
+
+
+def _init_worker(state):
+    global _STATE
+    _STATE = state
+
+
+def _pool_chunk(weight_matrix):
+    """Process-pool entry point, using the state sent once per worker"""
+    return _sweep_chunk(_STATE, weight_matrix)
+
+
+def _sweep_chunk(state, weight_matrix):
+    """
+    Rank statistics for one chunk of weight vectors: top-1 and top-n agent
+    indices per vector, plus rank and per-agent Kendall tau sums over the
+    candidate agents and each vector's overall tau.
+    """
+    scores = score_tensor(state['terms'], state['covered'], weight_matrix)
+    top_n = state['top_n']
+    top1 = np.argmax(scores, axis=1)
+    if top_n < scores.shape[1]:
+        # Members of each vector's top-n with top_k_indices' tie order: every score above the n-th
+        # best, then the lowest catalog indices among those equal to it
+        kth = -np.partition(-scores, top_n - 1, axis=1)[:, top_n - 1:top_n]
+        above = scores > kth
+        at_kth = scores == kth
+        member = above | (at_kth & (np.cumsum(at_kth, axis=1) <= top_n - above.sum(axis=1, keepdims=True)))
+        top = (np.flatnonzero(member) % scores.shape[1]).reshape(-1, top_n)
+    else:
+        top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+
+    candidates = state['candidates']
+    sub = scores[:, candidates]
+    # [k, i, j]: agent j against agent i under vector k; ties go to the lower catalog index, as in top_k_indices
+    greater = sub[:, None, :] > sub[:, :, None]
+    equal = sub[:, None, :] == sub[:, :, None]
+    ranks = 1 + (greater | (equal & state['earlier'])).sum(axis=2)
+
+    if len(candidates) > 1:
+        # +1 for pairs ordered (or tied) alike, -1 for reversed pairs, 0 when only one ranking ties them
+        sign = np.sign(sub[:, :, None] - sub[:, None, :])
+        concordance = np.where(sign == state['baseline_sign'], 1.0, sign * state['baseline_sign'])
+        agent_tau = (concordance.sum(axis=2) - 1) / (len(candidates) - 1)  # minus the agent's own pair
+    else:
+        agent_tau = np.ones_like(sub)
+
+    return {
+        'top1': top1,
+        'top': np.ascontiguousarray(top),
+        'rank_sum': ranks.sum(axis=0),
+        'rank_sq': (ranks.astype(np.float64) ** 2).sum(axis=0),
+        'tau_sum': agent_tau.sum(axis=0),
+        'sample_tau': agent_tau.mean(axis=1)
+    }
+
+
+def sensitivity_analysis(agents=None, threat_type='ransomware', weights=None, samples=1000, spread=0.5,
+                         method='random', levels=3, top_n=5, candidates=50, seed=None, workers=1):
+    """
+    Rank stability of the threat's recommendations under weight vectors
+    sampled around weights (a WEIGHT_PROFILES name, a dict or None). Returns
+    the sweep settings, Kendall tau statistics of the sampled rankings against
+    the profile's ranking, the share of vectors keeping its top agent first,
+    and one row per candidate agent (plus any outsider that reached the
+    top-n), ordered by the profile's rank. workers > 1 (None: CPU count)
+    spreads large sweeps over a process pool.
+    """
+    agents = AI_AGENTS if agents is None else agents
+    base = resolve_weights(weights)
+    weight_matrix = sample_weights(base, samples, spread, method, levels, seed)
+    features = score_features(agents)
+    count = len(features['cost'])
+    top_n = max(1, min(top_n, count))
+
+    baseline = np.maximum(0, _raw_score_matrix(agents, [threat_type], features, base)[:, 0])
+    order = top_k_indices(baseline, max(1, min(candidates, count)))
+    covered = (features['coverage_mask'] & np.uint64(THREAT_BITS.get(threat_type, 0))) != 0
+    terms = _linear_terms(features)
+    # Pair orders from the same arithmetic as the samples, so an unchanged vector gives tau = 1
+    base_vector = np.array([[base[name] for name in WEIGHT_FIELDS]], dtype=np.float64)
+    reference = score_tensor(terms[order], covered[order], base_vector)[0]
+    state = {
+        'terms': terms,
+        'covered': covered,
+        'top_n': top_n,
+        'candidates': order,
+        'earlier': order[None, :] < order[:, None],
+        'baseline_sign': np.sign(reference[:, None] - reference[None, :])
+    }
+
+    chunk = max(1, SCORE_CELLS // max(count, len(order) ** 2))
+    chunks = [weight_matrix[start:start + chunk] for start in range(0, len(weight_matrix), chunk)]
+    if workers == 1 or len(chunks) == 1 or weight_matrix.shape[0] * count < PARALLEL_MIN_CELLS:
+        results = [_sweep_chunk(state, part) for part in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state,)) as pool:
+            chunksize = max(1, len(chunks) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(pool.map(_pool_chunk, chunks, chunksize=chunksize))
+
+    vectors = len(weight_matrix)
+    top1_counts = np.bincount(np.concatenate([r['top1'] for r in results]), minlength=count)
+    top_counts = np.bincount(np.concatenate([r['top'].ravel() for r in results]), minlength=count)
+    rank_mean = sum(r['rank_sum'] for r in results) / vectors
+    rank_var = np.maximum(0, sum(r['rank_sq'] for r in results) / vectors - rank_mean ** 2)
+    agent_tau = sum(r['tau_sum'] for r in results) / vectors
+    sample_tau = np.concatenate([r['sample_tau'] for r in results])
+
+    names = agents['name']
+    position = {int(row): i for i, row in enumerate(order)}
+    rows = {int(row) for row in order} | {int(row) for row in np.flatnonzero(top_counts)}
+    report = []
+    for row in rows:
+        i = position.get(row)
+        # 1-based rank under the profile itself, with the same tie-breaking as top_k_indices
+        baseline_rank = int(np.count_nonzero(baseline > baseline[row])
+                            + np.count_nonzero(baseline[:row] == baseline[row])) + 1
+        report.append({
+            'agent': names[row],
+            'baseline_rank': baseline_rank,
+            'top1_frequency': float(top1_counts[row] / vectors),
+            'top_n_frequency': float(top_counts[row] / vectors),
+            'mean_rank': float(rank_mean[i]) if i is not None else None,
+            'rank_std': float(np.sqrt(rank_var[i])) if i is not None else None,
+            'kendall_tau': float(agent_tau[i]) if i is not None else None
+        })
+    report.sort(key=lambda entry: entry['baseline_rank'])
+
+    return {
+        'threat_type': threat_type,
+        'weights': {name: float(base[name]) for name in WEIGHT_FIELDS},
+        'method': method,
+        'spread': spread,
+        'samples': vectors,
+        'top_n': top_n,
+        'candidates': len(order),
+        'kendall_tau': {
+            'mean': float(sample_tau.mean()),
+            'p5': float(np.quantile(sample_tau, 0.05)),
+            'min': float(sample_tau.min())
+        },
+        'top1_stability': float(top1_counts[order[0]] / vectors),
+        'agents': report
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ranking sensitivity to the scoring weights")
+    parser.add_argument('--threat', default='ransomware', choices=list(THREAT_TYPES), help="threat type to rank for")
+    parser.add_argument('--profile', default='balanced', choices=list(WEIGHT_PROFILES),
+                        help="weight profile to sample around")
+    parser.add_argument('--method', default='random', choices=['random', 'grid'], help="weight sampling scheme")
+    parser.add_argument('--samples', type=int, default=10000, help="random weight vectors")
+    parser.add_argument('--levels', type=int, default=3, help="grid steps per weight (levels ** 6 vectors)")
+    parser.add_argument('--spread', type=float, default=0.5, help="relative weight range (0.5 = ±50%%)")
+    parser.add_argument('--top-n', type=int, default=5, help="size of the recommendation list")
+    parser.add_argument('--candidates', type=int, default=50, help="top agents covered by rank statistics")
+    parser.add_argument('--seed', type=int, help="seed for reproducible random samples")
+    parser.add_argument('--workers', type=int, help="processes (default: CPU count, 1 = in-process)")
+    parser.add_argument('--catalog', help="agent catalog directory, Parquet or Arrow file (default: built-in agents)")
+    parser.add_argument('--output', help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    agents = None
+    if args.catalog:
+        from catalog import load_catalog
+        agents = load_catalog(args.catalog)
+
+    start = time.perf_counter()
+    report = sensitivity_analysis(agents, args.threat, args.profile, args.samples, args.spread, args.method,
+                                  args.levels, args.top_n, args.candidates, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+
+    for entry in report['agents']:
+        ranks = (f"rank {entry['mean_rank']:5.2f} ± {entry['rank_std']:4.2f} | tau {entry['kendall_tau']:+.3f}"
+                 if entry['mean_rank'] is not None else "(outside candidates)")
+        print(f"#{entry['baseline_rank']:<5} {entry['agent']:<32} top-1 {entry['top1_frequency']:6.1%} | "
+              f"top-{report['top_n']} {entry['top_n_frequency']:6.1%} | {ranks}", file=sys.stderr)
+    tau = report['kendall_tau']
+    print(f"{report['samples']:,} weight vectors in {elapsed:.2f}s | Kendall tau mean {tau['mean']:.3f}, "
+          f"p5 {tau['p5']:.3f} | top agent kept first in {report['top1_stability']:.1%}", file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""
+CyberAI Orchestrator - Recommendation Service
+Serves the decision engine over HTTP (TCP or a Unix socket) so other tools
+(SOAR playbooks, ticketing hooks) can request recommendations directly.
+
+Concurrent requests are queued and scored together in micro-batches: a batch
+is flushed when it reaches --max-batch requests or --max-wait-ms after its
+first request, and the catalog is scored once per distinct threat in it.
+The queue is bounded (a full queue answers 503 immediately instead of letting
+latency grow) and every request carries a deadline (504 once it passes).
+Malformed requests get 400, bodies over MAX_BODY_BYTES 413, and unexpected
+errors are logged and answered with 500.
+
+Usage:
+    python service.py --port 8080
+    python service.py --unix /tmp/cyberai.sock --catalog catalog_dir/
+
+Endpoints:
+    POST /recommend   {"threat_type": "ransomware", "top_n": 5, "budget": 800,
+                       "min_effectiveness": 0.9, "seed": 7, "profile": "budget", "deadline_ms": 250}
+    GET  /stats       latency percentiles and request counts as JSON
+    GET  /metrics     the same in Prometheus text format
+    GET  /healthz
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+from engine import AI_AGENTS, DEFAULT_PROFILE, THREAT_TYPES, WEIGHT_PROFILES, RecommendationCache, recommend_batch
+from triage import _output_rows
+
+MAX_BODY_BYTES = 64 * 1024
+LATENCY_WINDOW = 10000
+
+
+class Overloaded(Exception):
+    """The request queue is full"""
+
+
+class DeadlineExceeded(Exception):
+    """The request deadline passed before it was scored"""
+
+
+class RequestError(Exception):
+    """An HTTP request that cannot be read; answered with status before the connection is closed"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyTracker:
+    """Latencies of the most recent requests plus per-status counts"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._latencies = deque(maxlen=window)
+        self.statuses = {}
+        self.batches = 0
+        self.batched_requests = 0
+
+    def observe(self, status, seconds):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status == HTTPStatus.OK:
+            self._latencies.append(seconds)
+
+    def observe_batch(self, size):
+        self.batches += 1
+        self.batched_requests += size
+
+    def percentiles(self):
+        """p50/p90/p99/max latency in milliseconds over the window"""
+        if not self._latencies:
+            return {'p50_ms': None, 'p90_ms': None, 'p99_ms': None, 'max_ms': None}
+        values = np.fromiter(self._latencies, dtype=np.float64) * 1000
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        return {'p50_ms': round(p50, 3), 'p90_ms': round(p90, 3), 'p99_ms': round(p99, 3),
+                'max_ms': round(values.max(), 3)}
+
+    def as_record(self):
+        return {
+            **self.percentiles(),
+            'window': len(self._latencies),
+            'statuses': {str(int(status)): count for status, count in sorted(self.statuses.items())},
+            'batches': self.batches,
+            'mean_batch_size': round(self.batched_requests / self.batches, 2) if self.batches else None
+        }
+
+    def to_prometheus(self, prefix='cyberai'):
+        p = prefix
+        lines = [
+            f'# HELP {p}_request_latency_seconds Latency of successful recommendation requests.',
+            f'# TYPE {p}_request_latency_seconds summary',
+        ]
+        for quantile, value in zip(('0.5', '0.9', '0.99'), list(self.percentiles().values())[:3]):
+            if value is not None:
+                lines.append(f'{p}_request_latency_seconds{{quantile="{quantile}"}} {value / 1000:.6f}')
+        lines += [
+            f'# HELP {p}_requests_by_status_total Recommendation requests by HTTP status.',
+            f'# TYPE {p}_requests_by_status_total counter',
+        ]
+        for status, count in sorted(self.statuses.items()):
+            lines.append(f'{p}_requests_by_status_total{{status="{int(status)}"}} {count}')
+        lines += [
+            f'# HELP {p}_batches_total Micro-batches scored.',
+            f'# TYPE {p}_batches_total counter',
+            f'{p}_batches_total {self.batches}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+class MicroBatcher:
+    """
+    Collects concurrent recommendation requests into batches for recommend_batch.
+    Scoring runs on a single worker thread, so the event loop keeps accepting
+    requests (and filling the next batch) while a batch is being scored.
+    """
+
+    def __init__(self, agents=None, max_batch=64, max_wait=0.002, max_queue=1024,
+                 cache_size=4096, tracker=None):
+        # agents: a catalog, or a callable returning the current one (e.g. CatalogStore.get)
+        self.agents = AI_AGENTS if agents is None else agents
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = RecommendationCache(cache_size)
+        self.tracker = tracker or LatencyTracker()
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scoring')
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    @property
+    def queued(self):
+        return self._queue.qsize()
+
+    async def submit(self, alert, top_n, seed, deadline):
+        """
+        Recommendations for one alert. deadline is an event-loop time; raises
+        Overloaded when the queue is full and DeadlineExceeded once it passes.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        try:
+            self._queue.put_nowait((deadline, alert, top_n, seed, future))
+        except asyncio.QueueFull:
+            raise Overloaded() from None
+        try:
+            return await asyncio.wait_for(future, max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded() from None
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        flush_at = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = flush_at - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _score(self, batch):
+        """Worker thread: one recommend_batch call per (top_n, seed, weight profile) group"""
+        agents = self.agents() if callable(self.agents) else self.agents
+        groups = {}
+        for position, (_, alert, top_n, seed, _) in enumerate(batch):
+            groups.setdefault((top_n, seed, alert.get('profile')), []).append(position)
+        results = [None] * len(batch)
+        for (top_n, seed, profile), positions in groups.items():
+            scored = recommend_batch(agents, [batch[p][1] for p in positions], top_n=top_n, seed=seed,
+                                     cache=self.cache if seed is not None else None, weights=profile)
+            for position, recommendations in zip(positions, scored):
+                results[position] = recommendations
+        return results
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            now = loop.time()
+            # Requests whose caller already gave up (deadline or disconnect) are not scored
+            live = [item for item in batch if not item[4].done() and item[0] > now]
+            if not live:
+                continue
+            self.tracker.observe_batch(len(live))
+            try:
+                results = await loop.run_in_executor(self._executor, self._score, live)
+            except Exception as exc:
+                for item in live:
+                    if not item[4].done():
+                        item[4].set_exception(exc)
+                continue
+            for item, recommendations in zip(live, results):
+                if not item[4].done():
+                    item[4].set_result(recommendations)
+
+
+def parse_recommend_request(body, default_deadline):
+    """Validated (alert, top_n, seed, deadline seconds) from a /recommend JSON body"""
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError as exc:
+        raise ValueError(f"Invalid JSON: {exc}") from None
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+
+    threat_type = payload.get('threat_type')
+    if threat_type not in THREAT_TYPES:
+        raise ValueError(f"Unknown threat type {threat_type!r}")
+    top_n = int(payload.get('top_n', 5))
+    if not 1 <= top_n <= 100:
+        raise ValueError("top_n must be between 1 and 100")
+    seed = payload.get('seed')
+    profile = payload.get('profile', DEFAULT_PROFILE)
+    if profile not in WEIGHT_PROFILES:
+        raise ValueError(f"Unknown weight profile {profile!r}")
+    alert = {
+        'id': payload.get('id'),
+        'threat_type': threat_type,
+        'budget': None if payload.get('budget') is None else float(payload['budget']),
+        'min_effectiveness': None if payload.get('min_effectiveness') is None else float(payload['min_effectiveness']),
+        'profile': profile
+    }
+    deadline_ms = payload.get('deadline_ms')
+    deadline = default_deadline if deadline_ms is None else float(deadline_ms) / 1000
+    return alert, top_n, None if seed is None else int(seed), deadline
+
+
+class RecommendationService:
+    """Minimal HTTP/1.1 (keep-alive) front end for a MicroBatcher"""
+
+    def __init__(self, batcher, default_deadline=0.5):
+        self.batcher = batcher
+        self.tracker = batcher.tracker
+        self.default_deadline = default_deadline
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except RequestError as exc:
+                    # The rest of the stream cannot be trusted, so answer and close
+                    self.tracker.observe(exc.status, 0.0)
+                    self._write_response(writer, exc.status, 'application/json', {'error': str(exc)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, content_type, payload = await self._dispatch(method, path, body)
+                except Exception:
+                    print(f"Error handling {method} {path}:", file=sys.stderr)
+                    traceback.print_exc(file=sys.stderr)
+                    status, content_type, payload = (HTTPStatus.INTERNAL_SERVER_ERROR, 'application/json',
+                                                     {'error': "Internal server error"})
+                    self.tracker.observe(status, 0.0)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, content_type, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Malformed request line") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+        if length < 0:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                               f"Request body exceeds {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return method, path.split('?', 1)[0], headers, body
+
+    async def _dispatch(self, method, path, body):
+        if method == 'POST' and path == '/recommend':
+            return await self._recommend(body)
+        if method == 'GET' and path == '/stats':
+            record = {**self.tracker.as_record(), 'queued': self.batcher.queued}
+            return HTTPStatus.OK, 'application/json', record
+        if method == 'GET' and path == '/metrics':
+            return HTTPStatus.OK, 'text/plain; version=0.0.4', self.tracker.to_prometheus()
+        if method == 'GET' and path == '/healthz':
+            return HTTPStatus.OK, 'application/json', {'status': 'ok'}
+        return HTTPStatus.NOT_FOUND, 'application/json', {'error': f"No route for {method} {path}"}
+
+    async def _recommend(self, body):
+        start = time.perf_counter()
+        try:
+            alert, top_n, seed, deadline = parse_recommend_request(body, self.default_deadline)
+        except (ValueError, TypeError) as exc:
+            self.tracker.observe(HTTPStatus.BAD_REQUEST, time.perf_counter() - start)
+            return HTTPStatus.BAD_REQUEST, 'application/json', {'error': str(exc)}
+        # Anything else raised while scoring reaches handle_connection and is answered with 500
+        try:
+            loop = asyncio.get_running_loop()
+            recommendations = await self.batcher.submit(alert, top_n, seed, loop.time() + deadline)
+            rows = _output_rows(alert, recommendations)
+            status, payload = HTTPStatus.OK, {
+                'id': alert['id'],
+                'threat_type': alert['threat_type'],
+                'recommendations': [
+                    {k: v for k, v in row.items() if k not in ('alert_id', 'threat_type')} for row in rows
+                ]
+            }
+        except Overloaded:
+            status, payload = HTTPStatus.SERVICE_UNAVAILABLE, {'error': "Request queue is full, retry later"}
+        except DeadlineExceeded:
+            status, payload = HTTPStatus.GATEWAY_TIMEOUT, {'error': "Deadline exceeded"}
+        self.tracker.observe(status, time.perf_counter() - start)
+        return status, 'application/json', payload
+
+    @staticmethod
+    def _write_response(writer, status, content_type, payload, keep_alive):
+        body = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+        headers = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            headers.append("Retry-After: 1")
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+
+
+async def serve(host='127.0.0.1', port=8080, unix_path=None, agents=None, max_batch=64,
+                max_wait=0.002, max_queue=1024, default_deadline=0.5, cache_size=4096):
+    batcher = MicroBatcher(agents, max_batch=max_batch, max_wait=max_wait,
+                           max_queue=max_queue, cache_size=cache_size)
+    batcher.start()
+    service = RecommendationService(batcher, default_deadline=default_deadline)
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle_connection, path=unix_path, backlog=1024)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port, backlog=1024)
+        where = f"http://{host}:{port}"
+    print(f"CyberAI recommendation service listening on {where}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP recommendation service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', help="listen on this Unix socket instead of TCP")
+    parser.add_argument('--max-batch', type=int, default=64, help="requests scored per batch")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help="longest a batch waits to fill")
+    parser.add_argument('--max-queue', type=int, default=1024, help="queued requests before answering 503")
+    parser.add_argument('--deadline-ms', type=float, default=500.0, help="default per-request deadline")
+    parser.add_argument('--cache-size', type=int, default=4096, help="LRU entries for seeded requests")
+    parser.add_argument('--catalog', help="agent catalog directory, Parquet or Arrow file (default: built-in agents)")
+    args = parser.parse_args(argv)
+
+    agents = None
+    if args.catalog:
+        from catalog import CatalogStore
+        agents = CatalogStore(args.catalog).get
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, agents, max_batch=args.max_batch,
+                          max_wait=args.max_wait_ms / 1000, max_queue=args.max_queue,
+                          default_deadline=args.deadline_ms / 1000, cache_size=args.cache_size))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
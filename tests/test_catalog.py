@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+
+import catalog
+from bench import synthetic_catalog
+from catalog import CatalogStore, _read_manifest, load_catalog, write_catalog
+
+
+def _files(directory):
+    return {spec['file'] for spec in _read_manifest(directory)['columns'].values()}
+
+
+def test_previous_generation_stays_readable(tmp_path):
+    directory = str(tmp_path)
+    write_catalog(directory, synthetic_catalog(50, seed=1))
+    first = _files(directory)
+    write_catalog(directory, synthetic_catalog(50, seed=2))
+    second = _files(directory)
+
+    # A reader holding the first manifest can still map every column
+    for name in first:
+        np.load(os.path.join(directory, name), mmap_mode='r')
+
+    write_catalog(directory, synthetic_catalog(50, seed=3))
+    on_disk = {entry for entry in os.listdir(directory) if entry.endswith('.npy')}
+    assert on_disk == second | _files(directory)
+    assert len(load_catalog(directory)) == 50
+
+
+def test_store_retries_initial_load(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+    write_catalog(directory, synthetic_catalog(20, seed=0))
+    load_directory, calls = catalog._load_directory, []
+
+    def flaky(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise FileNotFoundError("column file removed by a concurrent write")
+        return load_directory(*args, **kwargs)
+
+    monkeypatch.setattr(catalog, '_load_directory', flaky)
+    store = CatalogStore(directory)
+    assert len(store.get()) == 20 and len(calls) == 2
@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip('plotly')
+
+from charts import precompute_radar_traces, radar_comparison_figure, radar_figure, radar_values
+from engine import AGENT_RECORDS, RECOMMENDATION_CACHE, AgentCatalog, rank_agents
+
+
+def test_agents_sharing_a_name_get_their_own_radar():
+    base = next(r for r in AGENT_RECORDS if 'ransomware' in r['coverage'])
+    agents = AgentCatalog.from_records([
+        dict(base, id=1, name="Twin Agent", speed=2.0, effectiveness=0.99, fp_rate=0.0, cost=10),
+        dict(base, id=2, name="Twin Agent", speed=9.0, effectiveness=0.99, fp_rate=0.0, cost=10),
+    ])
+    version = RECOMMENDATION_CACHE.version(agents)
+    precompute_radar_traces(agents)
+    first, second = rank_agents(agents, 'ransomware', top_n=2, seed=0)
+
+    assert list(radar_figure(first, version).data[0].r) == radar_values(first)
+    assert list(radar_figure(second, version).data[0].r) == radar_values(second)
+    combined = radar_comparison_figure([first, second], version)
+    assert [list(trace.r) for trace in combined.data] == [radar_values(first), radar_values(second)]
+    assert radar_comparison_figure([second, first], version) is not combined
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from bench import synthetic_catalog
+from catalog import compact_columns
+from engine import (AI_AGENTS, THREAT_TYPES, WEIGHT_PROFILES, AgentCatalog, calculate_agent_score, rank_agents,
+                    score_agents_matrix, threat_rows, top_k_indices)
+
+
+def _float32_catalog():
+    catalog = AgentCatalog(*compact_columns(synthetic_catalog(300, seed=5)))
+    assert catalog['effectiveness'].dtype == np.float32
+    return catalog
+
+
+@pytest.mark.parametrize('agents', [AI_AGENTS, _float32_catalog()], ids=['builtin', 'synthetic_float32'])
+@pytest.mark.parametrize('profile', list(WEIGHT_PROFILES))
+def test_matrix_matches_reference_score(agents, profile):
+    records = agents.records()
+    matrix = score_agents_matrix(agents, weights=profile)
+    for column, threat in enumerate(THREAT_TYPES):
+        reference = [calculate_agent_score(record, threat, weights=profile)['score'] for record in records]
+        np.testing.assert_array_equal(matrix[:, column], reference)
+
+
+@pytest.mark.parametrize('agents', [AI_AGENTS, _float32_catalog()], ids=['builtin', 'synthetic_float32'])
+def test_rank_agents_matches_sorted_reference(agents):
+    records = agents.records()
+    for threat in THREAT_TYPES:
+        reference = sorted((calculate_agent_score(record, threat, seed=1) for record in records),
+                           key=lambda rec: rec['score'], reverse=True)[:5]
+        ranked = rank_agents(agents, threat, seed=1)
+        assert [{k: v for k, v in rec.items() if k != 'row'} for rec in ranked] == reference
+
+
+def test_threat_rows_index():
+    for threat in THREAT_TYPES:
+        expected = [row for row, coverage in enumerate(AI_AGENTS['coverage']) if threat in coverage.split(',')]
+        assert threat_rows(AI_AGENTS, threat).tolist() == expected
+        assert threat_rows(AI_AGENTS, threat) is threat_rows(AI_AGENTS, threat)
+
+
+def test_top_k_matches_stable_sort_on_ties():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        scores = rng.integers(0, 4, size=rng.integers(1, 80)).astype(np.float64)
+        k = int(rng.integers(0, 90))
+        assert top_k_indices(scores, k).tolist() == np.argsort(-scores, kind='stable')[:k].tolist()
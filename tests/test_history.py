@@ -0,0 +1,46 @@
+import io
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from engine import AI_AGENTS, RECOMMENDATION_CACHE, WEIGHT_PROFILES
+from history import HistoryWriter, RecommendationHistory
+from triage import read_alerts, triage
+
+
+def _record(directory, profile):
+    alerts = ''.join(f'{{"threat_type": "{threat}"}}\n' for threat in
+                     ('ransomware', 'phishing', 'ddos', 'apt', 'insider_threat', 'zero_day', 'web_attack', 'malware'))
+    with HistoryWriter(directory) as writer:
+        triage(read_alerts(io.StringIO(alerts), 'jsonl'), io.StringIO(), top_n=5, seed=7, weights=profile,
+               history=writer)
+
+
+def test_replay_keeps_recorded_profile(tmp_path):
+    _record(str(tmp_path / 'history'), 'budget')
+    history = RecommendationHistory(str(tmp_path / 'history'))
+
+    with HistoryWriter(str(tmp_path / 'replayed')) as writer:
+        result = history.replay(AI_AGENTS, writer=writer)
+    assert result['runs'] == 8
+    assert result['top1_change_rate'] == 0.0 and result['mean_overlap'] == 1.0
+    replayed = RecommendationHistory(str(tmp_path / 'replayed'))
+    assert {run['profile'] for run in replayed.runs()} == {'budget'}
+    assert {run['catalog_version'] for run in replayed.runs()} == {RECOMMENDATION_CACHE.version(AI_AGENTS)}
+
+    # An explicit profile overrides the recorded one and is what the replay records
+    with HistoryWriter(str(tmp_path / 'override')) as writer:
+        result = history.replay(AI_AGENTS, 'balanced', writer=writer)
+    assert result['top1_changed'] > 0
+    assert {run['profile'] for run in RecommendationHistory(str(tmp_path / 'override')).runs()} == {'balanced'}
+
+
+def test_unprofiled_runs_record_default_and_custom_weights_are_rejected(tmp_path):
+    _record(str(tmp_path / 'history'), None)
+    assert {run['profile'] for run in RecommendationHistory(str(tmp_path / 'history')).runs()} == {'balanced'}
+
+    with HistoryWriter(str(tmp_path / 'custom')) as writer, pytest.raises(ValueError):
+        triage([], io.StringIO(), weights=dict(WEIGHT_PROFILES['budget']), history=writer)
+    # Without history, custom weights are still accepted
+    assert triage([], io.StringIO(), weights=dict(WEIGHT_PROFILES['budget'])) == 0
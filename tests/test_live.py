@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from bench import synthetic_catalog
+from engine import AI_AGENTS, THREAT_TYPES, AgentCatalog, rank_agents
+from live import LiveRankings
+
+
+def _random_updates(live, rng, count):
+    """Mixes demotions of ranked agents, promotions of random ones and small metric changes"""
+    n = len(live.catalog)
+    threats = list(THREAT_TYPES)
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.35:
+            # A tracked agent falling past the last tracked one, or out of the ranking entirely
+            row = int(rng.choice(live.top(threats[rng.integers(len(threats))])))
+            live.update(int(live.catalog['id'][row]),
+                        effectiveness=float(rng.uniform(0.0, 0.5)), cost=float(rng.uniform(500, 5000)))
+        elif kind < 0.6:
+            row = int(rng.integers(n))
+            live.update(int(live.catalog['id'][row]), effectiveness=1.0, speed=10.0, fp_rate=0.0, cost=10.0)
+        else:
+            row = int(rng.integers(n))
+            live.update(int(live.catalog['id'][row]), effectiveness=float(np.round(rng.uniform(0.7, 1.0), 2)),
+                        speed=float(np.round(rng.uniform(5, 10), 1)), fp_rate=float(np.round(rng.uniform(0, 0.2), 2)),
+                        cost=float(np.round(rng.uniform(100, 2500), -1)))
+
+
+def _assert_matches_full_recompute(live):
+    assert live.verify() == []
+    fresh = AgentCatalog(live.catalog.columns, live.catalog.categories)
+    for threat in THREAT_TYPES:
+        recommended = live.recommend(threat, seed=0)
+        assert recommended == rank_agents(fresh, threat, top_n=live.k, seed=0, weights=live.weights)
+        assert recommended == rank_agents(live.catalog, threat, top_n=live.k, seed=0, weights=live.weights)
+
+
+@pytest.mark.parametrize('k, slack', [(5, None), (5, 0), (1, 0), (20, 10), (25, 0)])
+def test_builtin_catalog(k, slack):
+    # k + slack >= 25 tracks every built-in agent
+    live = LiveRankings(AI_AGENTS, k=k, slack=slack)
+    rng = np.random.default_rng(k * 100 + (slack or 0))
+    for _ in range(20):
+        _random_updates(live, rng, 25)
+        _assert_matches_full_recompute(live)
+
+
+@pytest.mark.parametrize('slack', [None, 0])
+def test_synthetic_catalog(slack):
+    live = LiveRankings(synthetic_catalog(3000, seed=4), k=5, weights='budget', slack=slack)
+    rng = np.random.default_rng(11)
+    for _ in range(10):
+        _random_updates(live, rng, 100)
+        _assert_matches_full_recompute(live)
+    assert live.refills > 0
+
+
+def test_updates_are_validated():
+    live = LiveRankings(AI_AGENTS, k=3)
+    with pytest.raises(ValueError):
+        live.update(1, effectiveness=1.5)
+    with pytest.raises(ValueError):
+        live.update(1, cost=0)
+    with pytest.raises(ValueError):
+        live.update("No Such Agent", speed=5.0)
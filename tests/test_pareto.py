@@ -0,0 +1,39 @@
+import numpy as np
+
+from bench import synthetic_catalog
+from engine import THREAT_TYPES, threat_rows
+from pareto import _oriented_metrics, pareto_frontier, skyline
+
+
+def brute_skyline(points):
+    """Rows no other row dominates (>= everywhere and not identical), by pairwise comparison"""
+    return {
+        i for i in range(len(points))
+        if not any((points[j] >= points[i]).all() and (points[j] != points[i]).any() for j in range(len(points)))
+    }
+
+
+def test_skyline_matches_brute_force_on_ties():
+    rng = np.random.default_rng(0)
+    for _ in range(60):
+        points = rng.integers(0, 4, size=(int(rng.integers(1, 120)), int(rng.integers(1, 5)))).astype(np.float64)
+        rows = skyline(points, block_size=int(rng.integers(1, 16)))
+        assert len(rows) == len(set(rows.tolist()))
+        assert set(rows.tolist()) == brute_skyline(points)
+
+
+def test_constrained_frontier_is_skyline_of_constrained_subset():
+    agents = synthetic_catalog(600, seed=2)
+    metrics = _oriented_metrics(agents)
+    cost, effectiveness = np.asarray(agents['cost']), np.asarray(agents['effectiveness'])
+    for threat in list(THREAT_TYPES)[:5]:
+        for max_cost, min_effectiveness in ((None, None), (700, None), (None, 0.9), (650, 0.88), (1, None)):
+            rows = threat_rows(agents, threat)
+            if max_cost is not None:
+                rows = rows[cost[rows] <= max_cost]
+            if min_effectiveness is not None:
+                rows = rows[effectiveness[rows] >= min_effectiveness]
+            expected = {agents['name'][rows[i]] for i in brute_skyline(metrics[rows])}
+
+            frontier = pareto_frontier(agents, threat, max_cost=max_cost, min_effectiveness=min_effectiveness)
+            assert {entry['agent'] for entry in frontier} == expected
@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip('fpdf')
+
+import playbook
+from engine import AI_AGENTS, rank_agents
+from playbook import generate_pdf_playbook, render_playbooks
+
+
+def test_cached_playbook_is_not_served_on_a_later_day(monkeypatch):
+    recommendations = rank_agents(AI_AGENTS, 'phishing', seed=3)
+    monkeypatch.setattr(playbook, '_generated_on', lambda: '2026-01-01')
+    first = generate_pdf_playbook('phishing', recommendations)
+    assert generate_pdf_playbook('phishing', recommendations) is first
+
+    monkeypatch.setattr(playbook, '_generated_on', lambda: '2026-01-02')
+    later = generate_pdf_playbook('phishing', recommendations)
+    assert later is not first
+    assert render_playbooks([('phishing', recommendations)], workers=1) == [later]
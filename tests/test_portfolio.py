@@ -0,0 +1,49 @@
+from itertools import combinations
+
+import numpy as np
+
+from bench import synthetic_catalog
+from engine import AI_AGENTS, THREAT_BITS, _raw_score_matrix, coverage_masks
+from portfolio import optimize_portfolio
+
+
+def brute_force(agents, threats, budget):
+    """Highest utility over every agent set of up to len(threats) agents, each threat given to its best member"""
+    scores = np.maximum(0, _raw_score_matrix(agents, threats))
+    covers = np.stack([(coverage_masks(agents) & np.uint64(THREAT_BITS[t])) != 0 for t in threats], axis=1)
+    costs = np.asarray(agents['cost'], dtype=np.float64)
+    best = None
+    for size in range(1, len(threats) + 1):
+        for rows in combinations(range(len(costs)), size):
+            rows = list(rows)
+            if costs[rows].sum() > budget or not covers[rows].any(axis=0).all():
+                continue
+            utility = np.where(covers[rows], scores[rows], -np.inf).max(axis=0).sum()
+            if best is None or utility > best + 1e-9:
+                best = utility
+    return best
+
+
+def test_matches_exhaustive_search():
+    feasible = 0
+    for threats in (['ransomware', 'phishing', 'ddos'], ['phishing', 'apt', 'zero_day'],
+                    ['ransomware', 'data_exfiltration', 'insider_threat']):
+        for budget in (500, 900, 1100, 1300, 1500, 2000, 3000):
+            expected = brute_force(AI_AGENTS, threats, budget)
+            result = optimize_portfolio(threats, budget, AI_AGENTS)
+            assert result['feasible'] == (expected is not None)
+            if expected is not None:
+                feasible += 1
+                assert abs(result['utility'] - expected) < 1e-9
+                assert result['total_cost'] <= budget
+    assert feasible >= 6
+
+
+def test_candidate_limit_is_flagged():
+    agents = synthetic_catalog(2000, seed=0)
+    threats = ['ransomware', 'phishing', 'ddos', 'malware']
+    exact = optimize_portfolio(threats, 3000, agents)
+    limited = optimize_portfolio(threats, 3000, agents, max_candidates=20)
+    assert exact['exact'] and not limited['exact']
+    assert limited['total_cost'] <= 3000
+    assert limited['utility'] <= exact['utility'] + 1e-9
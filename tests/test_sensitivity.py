@@ -0,0 +1,43 @@
+import numpy as np
+
+import sensitivity
+from engine import AGENT_RECORDS, AgentCatalog, score_features, top_k_indices
+from sensitivity import _linear_terms, sample_weights, score_tensor, sensitivity_analysis
+
+
+def _tied_catalog():
+    """Every built-in agent three times over, so scores tie exactly"""
+    records = [dict(record, id=copy * 1000 + record['id']) for copy in range(3) for record in AGENT_RECORDS]
+    return AgentCatalog.from_records(records)
+
+
+def test_zero_spread_is_perfectly_stable():
+    report = sensitivity_analysis(_tied_catalog(), 'ransomware', 'low_noise', samples=20, spread=0.0, seed=1)
+    assert report['kendall_tau'] == {'mean': 1.0, 'p5': 1.0, 'min': 1.0}
+    assert report['top1_stability'] == 1.0
+    for entry in report['agents']:
+        if entry['mean_rank'] is not None:
+            assert entry['kendall_tau'] == 1.0 and entry['rank_std'] == 0.0
+            assert entry['mean_rank'] == entry['baseline_rank']
+        assert entry['top_n_frequency'] == (1.0 if entry['baseline_rank'] <= 5 else 0.0)
+
+
+def test_top_n_counts_follow_top_k_tie_order():
+    agents = _tied_catalog()
+    report = sensitivity_analysis(agents, 'phishing', 'budget', samples=200, spread=0.4, top_n=4, seed=7)
+
+    features = score_features(agents)
+    covered = (features['coverage_mask'] & np.uint64(sensitivity.THREAT_BITS['phishing'])) != 0
+    scores = score_tensor(_linear_terms(features), covered, sample_weights('budget', 200, 0.4, seed=7))
+    counts = np.bincount(np.concatenate([top_k_indices(row, 4) for row in scores]), minlength=len(agents))
+    names = agents['name']
+    expected = {names[row]: counts[row] / 200 for row in np.flatnonzero(counts)}
+    assert {e['agent']: e['top_n_frequency'] for e in report['agents'] if e['top_n_frequency']} == expected
+
+
+def test_results_do_not_depend_on_worker_count(monkeypatch):
+    monkeypatch.setattr(sensitivity, 'SCORE_CELLS', 2000)
+    monkeypatch.setattr(sensitivity, 'PARALLEL_MIN_CELLS', 0)
+    kwargs = dict(threat_type='ddos', weights='containment_first', samples=300, spread=0.5, seed=3)
+    assert sensitivity_analysis(_tied_catalog(), workers=1, **kwargs) == \
+        sensitivity_analysis(_tied_catalog(), workers=2, **kwargs)
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+from service import MAX_BODY_BYTES, MicroBatcher, RecommendationService
+
+
+async def _exchange(raw, score=None):
+    """Sends raw bytes to a fresh service; returns (status code, JSON body) of the response"""
+    batcher = MicroBatcher()
+    if score is not None:
+        batcher._score = score
+    batcher.start()
+    service = RecommendationService(batcher)
+    server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+    try:
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        writer.write(raw)
+        await writer.drain()
+        head = await reader.readuntil(b'\r\n\r\n')
+        length = int(next(line.split(b':')[1] for line in head.split(b'\r\n') if line.lower().startswith(b'content-length')))
+        body = await reader.readexactly(length)
+        writer.close()
+        return int(head.split(b' ')[1]), json.loads(body)
+    finally:
+        server.close()
+        await server.wait_closed()
+        await batcher.stop()
+
+
+def _post(body, content_length=None):
+    length = len(body) if content_length is None else content_length
+    return (f"POST /recommend HTTP/1.1\r\nContent-Length: {length}\r\nConnection: close\r\n\r\n").encode() + body
+
+
+def test_recommend():
+    status, payload = asyncio.run(_exchange(_post(b'{"threat_type": "ransomware", "top_n": 3}')))
+    assert status == 200 and len(payload['recommendations']) == 3
+
+
+def test_oversized_body_is_rejected():
+    status, payload = asyncio.run(_exchange(_post(b'', content_length=MAX_BODY_BYTES + 1)))
+    assert status == 413 and 'exceeds' in payload['error']
+
+
+def test_malformed_requests_get_400():
+    assert asyncio.run(_exchange(b"GARBAGE\r\n\r\n"))[0] == 400
+    assert asyncio.run(_exchange(_post(b'{}', content_length='x')))[0] == 400
+    assert asyncio.run(_exchange(_post(b'{"threat_type": "nope"}')))[0] == 400
+
+
+def test_scoring_failure_gets_500():
+    def score(batch):
+        raise RuntimeError("scoring backend failed")
+
+    status, payload = asyncio.run(_exchange(_post(b'{"threat_type": "ddos"}'), score=score))
+    assert status == 500 and payload == {'error': "Internal server error"}
@@ -0,0 +1,23 @@
+from engine import AGENT_RECORDS, AI_AGENTS, AgentCatalog, rank_agents
+from simulation import simulate_recommendations
+
+
+def test_agents_sharing_a_name_are_simulated_separately():
+    base = next(r for r in AGENT_RECORDS if 'ransomware' in r['coverage'])
+    records = [
+        dict(base, id=1, name="Twin Agent", speed=1.0, effectiveness=0.99, fp_rate=0.0, cost=10),
+        dict(base, id=2, name="Twin Agent", speed=10.0, effectiveness=0.99, fp_rate=0.0, cost=10),
+    ]
+    agents = AgentCatalog.from_records(records)
+    recommendations = rank_agents(agents, 'ransomware', top_n=2, seed=0)
+    assert [rec['row'] for rec in recommendations] == [1, 0]
+
+    recommendations, _ = simulate_recommendations(agents, 'ransomware', recommendations, trials=2000, seed=0)
+    fast, slow = (rec['containment']['p50'] for rec in recommendations)
+    assert fast < slow
+
+
+def test_no_recommendations_gives_no_comparison():
+    recommendations = rank_agents(AI_AGENTS, 'ransomware', max_cost=1, seed=0)
+    assert recommendations == []
+    assert simulate_recommendations(AI_AGENTS, 'ransomware', recommendations, trials=100) == ([], None)
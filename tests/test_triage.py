@@ -0,0 +1,30 @@
+import io
+import json
+
+from triage import read_alerts, triage
+
+
+def test_bad_records_are_skipped(capsys):
+    lines = [
+        '{"id": "a", "threat_type": "ransomware"}',
+        '{"threat_type": "phishing"',                             # malformed JSON
+        '["ransomware"]',                                         # not an object
+        '{"id": "b", "threat_type": "ddos", "budget": "cheap"}',  # non-numeric budget
+        '{"id": "c", "threat_type": "phishing", "min_effectiveness": "0.9"}',
+    ]
+    alerts = list(read_alerts(io.StringIO('\n'.join(lines) + '\n'), 'jsonl'))
+
+    assert [alert['id'] for alert in alerts] == ['a', 'c']
+    assert alerts[1]['min_effectiveness'] == 0.9
+    errors = capsys.readouterr().err
+    for line_no in (2, 3, 4):
+        assert f"Skipping alert {line_no}" in errors
+
+
+def test_triage_completes_past_bad_csv_row():
+    stream = io.StringIO("id,threat_type,budget\na,ransomware,500\nb,ddos,n/a\nc,phishing,\n")
+    out = io.StringIO()
+
+    assert triage(read_alerts(stream, 'csv'), out, top_n=3) == 2
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted({row['alert_id'] for row in rows}) == ['a', 'c']
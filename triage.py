@@ -0,0 +1,193 @@
+"""
+CyberAI Orchestrator - Headless Alert Triage
+Streams alerts (JSONL or CSV, from a file or stdin) through the decision engine
+in fixed-size chunks and writes the top-N agents per alert as JSONL or CSV.
+
+Usage:
+    python triage.py alerts.jsonl -o recommendations.jsonl
+    cat alerts.csv | python triage.py - --input-format csv --output-format csv
+
+Each alert carries a threat_type plus optional budget (max monthly cost per
+agent), min_effectiveness and id fields.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from engine import (AI_AGENTS, DEFAULT_PROFILE, RECOMMENDATION_CACHE, THREAT_TYPES, WEIGHT_PROFILES, RecommendationCache,
+                    recommend_batch)
+
+CSV_FIELDS = ['alert_id', 'threat_type', 'rank', 'agent', 'score', 'confidence',
+              'expected_time', 'effectiveness', 'speed', 'fp_rate', 'cost']
+
+
+def _optional_float(value):
+    """Parses an optional numeric constraint; blank or missing means no constraint"""
+    if value is None or value == '':
+        return None
+    return float(value)
+
+
+def read_alerts(stream, input_format):
+    """Yields normalized alert dicts from a JSONL or CSV stream, one at a time"""
+    if input_format == 'csv':
+        records = csv.DictReader(stream)
+    else:
+        records = (line for line in stream if line.strip())
+
+    for line_no, record in enumerate(records, 1):
+        # A bad record is skipped like an unknown threat type instead of aborting the stream
+        try:
+            if input_format != 'csv':
+                record = json.loads(record)
+            threat_type = (record.get('threat_type') or '').strip()
+            alert = {
+                'id': record.get('id') or str(line_no),
+                'threat_type': threat_type,
+                'budget': _optional_float(record.get('budget')),
+                'min_effectiveness': _optional_float(record.get('min_effectiveness'))
+            }
+        except (json.JSONDecodeError, AttributeError, TypeError, ValueError) as exc:
+            print(f"Skipping alert {line_no}: malformed record ({exc})", file=sys.stderr)
+            continue
+        if threat_type not in THREAT_TYPES:
+            print(f"Skipping alert {line_no}: unknown threat type {threat_type!r}", file=sys.stderr)
+            continue
+        yield alert
+
+
+def chunked(iterable, size):
+    """Splits an iterable into lists of at most size items without reading ahead"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _output_rows(alert, recommendations):
+    """Flattens one alert's recommendations into JSON-serializable rows"""
+    return [
+        {
+            'alert_id': alert['id'],
+            'threat_type': alert['threat_type'],
+            'rank': rank,
+            'agent': rec['agent'],
+            'score': round(float(rec['score']), 4),
+            'confidence': int(rec['confidence']),
+            'expected_time': int(rec['expected_time']),
+            'effectiveness': float(rec['effectiveness']),
+            'speed': float(rec['speed']),
+            'fp_rate': float(rec['fp_rate']),
+            'cost': float(rec['cost'])
+        }
+        for rank, rec in enumerate(recommendations, 1)
+    ]
+
+
+def triage(alerts, out, output_format='jsonl', top_n=5, chunk_size=1000, agents=None,
+           seed=None, cache_size=4096, weights=None, history=None):
+    """
+    Scores alerts chunk by chunk and writes recommendations to out, using
+    weights (a WEIGHT_PROFILES name or weights dict) for scoring. Every run
+    is also appended to history (a HistoryWriter) when given; history stores
+    the profile by name, so custom weights dicts are rejected with it.
+    Memory is bounded by chunk_size (plus an LRU of cache_size results when
+    seeded); returns the number of alerts processed.
+    """
+    agents = AI_AGENTS if agents is None else agents
+    if history is not None and not (weights is None or isinstance(weights, str)):
+        raise ValueError("Recording history needs a WEIGHT_PROFILES name, not custom weights, so runs can be replayed")
+    catalog_version = RECOMMENDATION_CACHE.version(agents) if history is not None else None
+    cache = RecommendationCache(cache_size) if seed is not None else None
+    writer = None
+    if output_format == 'csv':
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+
+    processed = 0
+    for chunk in chunked(alerts, chunk_size):
+        batch = recommend_batch(agents, chunk, top_n=top_n, seed=seed, cache=cache, weights=weights)
+        for alert, recommendations in zip(chunk, batch):
+            if history is not None:
+                history.record(alert['threat_type'], recommendations, source='triage', top_n=top_n,
+                               budget=alert['budget'], min_effectiveness=alert['min_effectiveness'], seed=seed,
+                               profile=weights or DEFAULT_PROFILE,
+                               catalog_version=catalog_version)
+            rows = _output_rows(alert, recommendations)
+            if writer is not None:
+                writer.writerows(rows)
+            else:
+                out.write(json.dumps({
+                    'alert_id': alert['id'],
+                    'threat_type': alert['threat_type'],
+                    'recommendations': [
+                        {k: v for k, v in row.items() if k not in ('alert_id', 'threat_type')}
+                        for row in rows
+                    ]
+                }) + '\n')
+        processed += len(chunk)
+    return processed
+
+
+def _guess_format(path):
+    """Infers jsonl/csv from a file extension, defaulting to jsonl"""
+    return 'csv' if path and path.lower().endswith('.csv') else 'jsonl'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk alert triage with the CyberAI-Orchestrator decision engine")
+    parser.add_argument('input', nargs='?', default='-', help="alerts file (JSONL or CSV), '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="output file, '-' for stdout")
+    parser.add_argument('--input-format', choices=['jsonl', 'csv'], help="default: from file extension")
+    parser.add_argument('--output-format', choices=['jsonl', 'csv'], help="default: from file extension")
+    parser.add_argument('--top-n', type=int, default=5, help="agents to recommend per alert")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="alerts scored per batch")
+    parser.add_argument('--seed', type=int, help="reproducible expected times; enables the result cache")
+    parser.add_argument('--cache-size', type=int, default=4096, help="LRU entries kept when --seed is set")
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, choices=list(WEIGHT_PROFILES), help="scoring weight profile")
+    parser.add_argument('--history', help="append every run to this recommendation history directory")
+    parser.add_argument('--catalog', help="agent catalog directory, Parquet or Arrow file (default: built-in agents)")
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or _guess_format(args.input if args.input != '-' else None)
+    output_format = args.output_format or _guess_format(args.output if args.output != '-' else None)
+
+    agents = None
+    if args.catalog:
+        from catalog import load_catalog
+        agents = load_catalog(args.catalog)
+
+    history = None
+    if args.history:
+        from history import HistoryWriter
+        history = HistoryWriter(args.history)
+
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    try:
+        start = time.perf_counter()
+        processed = triage(read_alerts(source, input_format), sink, output_format,
+                           top_n=args.top_n, chunk_size=args.chunk_size, agents=agents,
+                           seed=args.seed, cache_size=args.cache_size, weights=args.profile, history=history)
+        elapsed = time.perf_counter() - start
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        if history is not None:
+            history.close()
+
+    rate = processed / elapsed if elapsed > 0 else float('inf')
+    print(f"Triaged {processed} alerts in {elapsed:.2f}s ({rate:,.0f} alerts/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())